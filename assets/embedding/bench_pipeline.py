@@ -0,0 +1,197 @@
+# bench_pipeline.py
+# end-to-end scaling benchmark on synthetic KOI/TESS-shaped catalogs
+#
+#   python bench_pipeline.py                                  # koi + tess at 10k..1M rows, PCA
+#   python bench_pipeline.py --sizes 10000 50000 --projectors pca tsne --clusterers kmeans minibatch
+#   python bench_pipeline.py --save_baseline                  # record this machine's numbers
+#   python bench_pipeline.py --tolerance 0.2                  # exit 1 if anything regressed vs baseline
+#   python bench_pipeline.py --modes default lean             # peak RSS with and without --lean
+#
+# Synthetic tables resample the labelled, complete rows of the bundled CSVs with
+# replacement, jitter every continuous feature by 5% of its std and suffix the IDs so
+# they stay unique. Each configuration runs the real make_*_embedding.py CLI in its own
+# process (--no_cache --no_serve --profile), so rows/s, peak RSS and the per-stage
+# breakdown come from the same code path users run.
+
+import json, os, sys, time, argparse, platform, subprocess
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from embed3d.datasets import KOI, TESS
+from embed3d.ingest import read_table
+
+HERE = Path(__file__).resolve().parent
+SCRIPTS = {"koi": "make_koi_embedding.py", "tess": "make_tess_embedding.py", "comb": "make_comb_embedding.py"}
+JITTER = 0.05   # x std, continuous features only
+
+# ---------------------------
+# CLI
+# ---------------------------
+p = argparse.ArgumentParser()
+p.add_argument("--datasets", nargs="+", choices=list(SCRIPTS), default=["koi", "tess"])
+p.add_argument("--sizes", nargs="+", type=int, default=[10_000, 50_000, 200_000, 1_000_000])
+p.add_argument("--projectors", nargs="+", choices=["pca", "tsne", "umap"], default=["pca"])
+p.add_argument("--clusterers", nargs="+", default=["auto"])
+p.add_argument("--modes", nargs="+", choices=["default", "lean"], default=["default"],
+               help="memory modes to run each configuration in (lean = --lean)")
+p.add_argument("--tsne_max_rows", type=int, default=20_000, help="skip t-SNE/UMAP above this many rows")
+p.add_argument("--n_jobs", type=int, default=-1)
+p.add_argument("--seed", type=int, default=0)
+p.add_argument("--timeout", type=int, default=3600, help="seconds per run")
+p.add_argument("--out_dir", default=str(HERE / "bench"),
+               help="synthetic data, run outputs and results.json (default: bench/ next to this script, git-ignored)")
+p.add_argument("--baseline", default=None, help="baseline to compare against (default <out_dir>/baseline.json)")
+p.add_argument("--save_baseline", action="store_true", help="write these results as the new baseline")
+p.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown/growth flagged as a regression")
+args = p.parse_args()
+
+OUT = Path(args.out_dir).resolve()
+BASELINE = Path(args.baseline) if args.baseline else OUT / "baseline.json"
+
+# ---------------------------
+# Synthetic catalogs
+# ---------------------------
+def synth_table(src, n: int, seed: int) -> Path:
+    """<out>/data/<source>_<n>_s<seed>.csv; generated once, reused after."""
+    path = OUT / "data" / f"{src.name.lower()}_{n}_s{seed}.csv"
+    if path.exists():
+        return path
+    cols = list(src.ids) + [src.target] + list(src.features)
+    raw = read_table(HERE / src.path, cols, dtypes={c: "float64" for c in src.features})
+    norm = raw[src.target].astype(str).str.strip().str.upper()
+    feats = raw[list(src.features)].apply(pd.to_numeric, errors="coerce")
+    ok = norm.isin(list(src.labels)) & feats.notna().all(axis=1)
+    base, feats = raw[ok].reset_index(drop=True), feats[ok].reset_index(drop=True)
+
+    rng = np.random.default_rng(seed)
+    take = rng.integers(0, len(base), size=n)
+    out = base.iloc[take].reset_index(drop=True)
+    for c in src.features:
+        v = feats[c].to_numpy()[take]
+        if np.unique(feats[c]).size > 2:  # leave 0/1 flags alone
+            v = v + rng.normal(0.0, JITTER * feats[c].std(), size=n)
+        out[c] = v
+    suffix = pd.Series(np.arange(n)).astype(str)
+    for c in src.ids:
+        if c in out.columns:
+            out[c] = out[c].astype(str).where(out[c].notna(), "") + "~" + suffix
+            out.loc[out[c].str.startswith("~"), c] = np.nan
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    out.to_csv(tmp, index=False)
+    tmp.replace(path)
+    return path
+
+def data_flags(ds: str, n: int) -> list:
+    if ds == "koi":
+        return ["--data", str(synth_table(KOI, n, args.seed))]
+    if ds == "tess":
+        return ["--data", str(synth_table(TESS, n, args.seed))]
+    # combined: half of each survey
+    return ["--koi", str(synth_table(KOI, n // 2, args.seed)), "--tess", str(synth_table(TESS, n - n // 2, args.seed))]
+
+# ---------------------------
+# Runs
+# ---------------------------
+def run_key(r) -> str:
+    key = f"{r['dataset']}/{r['rows']}/{r['projector']}/{r['clusterer']}"
+    return key + "/lean" if r.get("mode") == "lean" else key
+
+def run_one(ds: str, n: int, proj: str, clus: str, mode: str = "default") -> dict:
+    rec = {"dataset": ds, "rows": n, "projector": proj, "clusterer": clus, "mode": mode}
+    if proj != "pca" and n > args.tsne_max_rows:
+        return {**rec, "status": "skipped"}
+    run_dir = OUT / "runs" / run_key(rec).replace("/", "-")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    prof = run_dir / "profile.json"
+    cmd = [sys.executable, str(HERE / SCRIPTS[ds]), *data_flags(ds, n), "--out_dir", str(run_dir),
+           "--projector", proj, "--clusterer", clus, "--n_jobs", str(args.n_jobs), "--seed", str(args.seed),
+           "--no_cache", "--no_serve", "--profile", str(prof), *(["--lean"] if mode == "lean" else [])]
+    t0 = time.perf_counter()
+    try:
+        with open(run_dir / "log.txt", "w", encoding="utf-8") as log:
+            code = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, timeout=args.timeout, cwd=HERE).returncode
+    except subprocess.TimeoutExpired:
+        return {**rec, "status": "timeout"}
+    wall = time.perf_counter() - t0
+    if code or not prof.exists():
+        return {**rec, "status": f"failed ({code}, see {run_dir / 'log.txt'})"}
+    summary = json.loads(prof.read_text(encoding="utf-8"))
+    kept = summary.get("rows") or n
+    outputs = [f for f in run_dir.iterdir() if f.is_file() and f.name not in ("log.txt", "profile.json")]
+    return {
+        **rec, "status": "ok", "kept_rows": kept,
+        "wall_s": round(wall, 3), "pipeline_s": summary["total_wall_s"],
+        "rows_per_s": round(kept / summary["total_wall_s"], 1),
+        "peak_rss_mb": summary["peak_rss_mb"],
+        "output_bytes": sum(f.stat().st_size for f in outputs),
+        "stages": {s["stage"]: s["wall_s"] for s in summary["stages"]},
+    }
+
+# ---------------------------
+# Baseline comparison
+# ---------------------------
+# metric -> +1 if bigger is worse, -1 if smaller is worse
+METRICS = {"rows_per_s": -1, "peak_rss_mb": +1, "output_bytes": +1}
+
+def compare(results, baseline, tol) -> list:
+    base = {run_key(r): r for r in baseline.get("results", []) if r.get("status") == "ok"}
+    flagged = []
+    for r in results:
+        b = base.get(run_key(r))
+        if r["status"] != "ok" or b is None:
+            continue
+        for m, worse in METRICS.items():
+            change = (r[m] - b[m]) / b[m] if b[m] else 0.0
+            r.setdefault("vs_baseline", {})[m] = round(change, 4)
+            if worse * change > tol:
+                flagged.append(f"{run_key(r)}: {m} {b[m]:,} -> {r[m]:,} ({change:+.0%})")
+    return flagged
+
+if __name__ == "__main__":
+    OUT.mkdir(parents=True, exist_ok=True)
+    configs = [(ds, n, pj, cl, m) for ds in args.datasets for n in args.sizes
+               for pj in args.projectors for cl in dict.fromkeys(args.clusterers) for m in dict.fromkeys(args.modes)]
+    print(f"▶ {len(configs)} runs -> {OUT}")
+    results = []
+    for ds, n, pj, cl, m in configs:
+        r = run_one(ds, n, pj, cl, m)
+        results.append(r)
+        if r["status"] == "ok":
+            print(f"   {run_key(r):<34} {r['rows_per_s']:>11,.0f} rows/s  {r['pipeline_s']:8.2f}s  "
+                  f"peak {r['peak_rss_mb']:8.1f} MB  out {r['output_bytes'] / 2**20:7.1f} MB")
+        else:
+            print(f"   {run_key(r):<34} {r['status']}")
+
+    ok = [r for r in results if r["status"] == "ok"]
+    if ok:
+        stages = pd.DataFrame([{"run": run_key(r), **r["stages"]} for r in ok]).set_index("run").fillna(0)
+        print("\nseconds per stage:")
+        print(stages.round(3).to_string())
+    lean = {run_key({**r, "mode": "default"}): r for r in ok if r["mode"] == "lean"}
+    pairs = [(r, lean[run_key(r)]) for r in ok if r["mode"] == "default" and run_key(r) in lean]
+    if pairs:
+        print("\npeak RSS, default -> --lean:")
+        for d, l in pairs:
+            print(f"   {run_key(d):<34} {d['peak_rss_mb']:8.1f} -> {l['peak_rss_mb']:8.1f} MB "
+                  f"({(l['peak_rss_mb'] - d['peak_rss_mb']) / d['peak_rss_mb']:+.0%})")
+
+    flagged = []
+    if BASELINE.exists() and not args.save_baseline:
+        flagged = compare(results, json.loads(BASELINE.read_text(encoding="utf-8")), args.tolerance)
+        print(f"\n{'⚠️  regressions' if flagged else '✅ no regressions'} vs {BASELINE} (tolerance {args.tolerance:.0%})")
+        for f in flagged:
+            print(f"   {f}")
+
+    report = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count(), "numpy": np.__version__, "pandas": pd.__version__},
+        "seed": args.seed, "n_jobs": args.n_jobs, "results": results, "regressions": flagged,
+    }
+    (OUT / "results.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n✅ wrote {OUT / 'results.json'}")
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"✅ wrote {BASELINE}")
+    sys.exit(1 if flagged else 0)
@@ -0,0 +1,86 @@
+# bench_projectors.py
+# wall time + trustworthiness of every installed 3D projector on the bundled CSVs
+#
+#   python bench_projectors.py                      # all installed backends, KOI + TESS
+#   python bench_projectors.py --backends sklearn opentsne pca --n_jobs 8
+#
+# Results go to bench/projectors.json next to this script (git-ignored, like bench_pipeline.py's).
+
+import json, time, argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from embed3d.datasets import KOI_MAP, TESS_MAP
+from embed3d.pipeline import load, scale
+from embed3d.projectors import (
+    PROJECTORS, TSNE_BACKENDS, available_tsne_backends, run_tsne, default_perplexity,
+)
+
+# same rows/features as make_koi_embedding.py / make_tess_embedding.py
+DATASETS = {"koi": KOI_MAP, "tess": TESS_MAP}
+HERE = Path(__file__).resolve().parent
+
+# ---------------------------
+# CLI
+# ---------------------------
+p = argparse.ArgumentParser()
+p.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+p.add_argument("--backends", nargs="+", default=None,
+               help="t-SNE backends and/or umap/pca (default: every installed t-SNE backend + pca)")
+p.add_argument("--n_jobs", "--n-jobs", type=int, default=-1)
+p.add_argument("--seed", type=int, default=42)
+p.add_argument("--eval_rows", type=int, default=3000,
+               help="rows sampled for trustworthiness (it needs a dense n x n distance matrix)")
+p.add_argument("--neighbors", type=int, default=10, help="k for trustworthiness")
+p.add_argument("--out", default=str(HERE / "bench" / "projectors.json"))
+args = p.parse_args()
+
+backends = args.backends or available_tsne_backends() + ["pca"]
+
+def load_scaled(cfg):
+    return scale(load(cfg).X)[0]
+
+def run_backend(name, X):
+    if name in TSNE_BACKENDS:
+        return run_tsne(X, name, seed=args.seed, n_jobs=args.n_jobs)[0]
+    if name in PROJECTORS:
+        return PROJECTORS[name](X, args.seed, args.n_jobs, 3)
+    raise ValueError(f"unknown backend {name!r}")
+
+# ---------------------------
+# Run
+# ---------------------------
+from sklearn.manifold import trustworthiness
+
+rows = []
+for ds in args.datasets:
+    X = load_scaled(DATASETS[ds])
+    rng = np.random.default_rng(args.seed)
+    ev = np.sort(rng.choice(len(X), size=min(args.eval_rows, len(X)), replace=False))
+    print(f"▶ {ds}: {len(X):,} rows x {X.shape[1]} features (perplexity {default_perplexity(len(X))}, "
+          f"trustworthiness on {len(ev):,} rows, k={args.neighbors})")
+    for name in backends:
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            coords = np.asarray(run_backend(name, X))
+        except ImportError as e:
+            print(f"   {name:<10} unavailable ({e})")
+            rows.append({"dataset": ds, "backend": name, "status": "unavailable"})
+            continue
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+        tw = trustworthiness(X[ev], coords[ev], n_neighbors=args.neighbors)
+        rows.append({"dataset": ds, "backend": name, "status": "ok", "rows": len(X),
+                     "wall_s": round(wall, 3), "cpu_s": round(cpu, 3), "trustworthiness": round(float(tw), 4)})
+        print(f"   {name:<10} wall {wall:8.2f}s  cpu {cpu:8.2f}s  trustworthiness {tw:.4f}")
+
+# ---------------------------
+# Report
+# ---------------------------
+ok = [r for r in rows if r["status"] == "ok"]
+if ok:
+    print()
+    print(pd.DataFrame(ok).set_index(["dataset", "backend"])[["rows", "wall_s", "cpu_s", "trustworthiness"]].to_string())
+Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+Path(args.out).write_text(json.dumps({"n_jobs": args.n_jobs, "seed": args.seed, "results": rows}, indent=2), encoding="utf-8")
+print(f"\n✅ wrote {args.out}")
@@ -0,0 +1 @@
+# embed3d: shared building blocks for the make_*_embedding.py scripts
@@ -0,0 +1,79 @@
+# artifacts.py
+# content-addressed cache of the expensive pipeline outputs (X_scaled, coords, clabels)
+#
+# Entries live in <data dir>/.cache/artifacts/<key>.npz, keyed on the input file
+# hashes, the feature selection, projector/clusterer parameters and the seed.
+# A hit refreshes the entry's mtime; saving evicts least-recently-used entries
+# until the directory fits in max_bytes.
+
+import hashlib, io, json, os
+from pathlib import Path
+import numpy as np
+
+from .ingest import file_sha256, CACHE_DIRNAME
+
+ARTIFACT_VERSION = 1
+ARTIFACT_DIRNAME = "artifacts"
+DEFAULT_MAX_BYTES = 512 << 20
+
+def artifact_dir(data_path) -> Path:
+    return Path(data_path).resolve().parent / CACHE_DIRNAME / ARTIFACT_DIRNAME
+
+def matrix_digest(X) -> dict:
+    # rows that survive filtering; guards against label/filter changes in the scripts
+    return {"X": hashlib.sha256(np.ascontiguousarray(X, dtype=float).tobytes()).hexdigest(),
+            "shape": list(np.shape(X))}
+
+def artifact_key(files, X, **params) -> str:
+    """Hash of input file contents, the feature matrix and every parameter that shapes the output.
+    X may also be its matrix_digest(), taken before the matrix was scaled in place."""
+    spec = {
+        "v": ARTIFACT_VERSION,
+        "files": [file_sha256(f) for f in files],
+        **(X if isinstance(X, dict) else matrix_digest(X)),
+        "params": params,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+def load_artifacts(cache_dir, key):
+    """Returns (arrays dict, meta dict) or None on a miss/corrupt entry."""
+    path = Path(cache_dir) / f"{key}.npz"
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            arrays = {k: z[k] for k in z.files if k != "__meta__"}
+            meta = json.loads(str(z["__meta__"])) if "__meta__" in z.files else {}
+    except (OSError, ValueError, KeyError):
+        return None
+    os.utime(path)  # LRU: a hit counts as a use
+    return arrays, meta
+
+def save_artifacts(cache_dir, key, arrays: dict, meta=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Returns the entry's path, or None when the cache cannot be written."""
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{key}.npz"
+    buf = io.BytesIO()
+    np.savez(buf, __meta__=np.array(json.dumps(meta or {})), **{k: np.asarray(v) for k, v in arrays.items()})
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(buf.getvalue())
+        tmp.replace(path)
+        evict(cache_dir, max_bytes, keep=path)
+    except OSError:
+        return None  # read-only checkout: the fit itself is still returned
+    return path
+
+def evict(cache_dir, max_bytes, keep=None) -> list:
+    """Delete least-recently-used entries until the total size is <= max_bytes."""
+    entries = sorted(Path(cache_dir).glob("*.npz"), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in entries)
+    removed = []
+    for p in entries:
+        if total <= max_bytes:
+            break
+        if keep is not None and p == keep:
+            continue
+        total -= p.stat().st_size
+        p.unlink(missing_ok=True)
+        removed.append(p)
+    return removed
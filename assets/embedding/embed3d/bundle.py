@@ -0,0 +1,227 @@
+# bundle.py
+# compact columnar point bundle: <stem>.<sha12>.bin (typed arrays) + <stem>.manifest.json
+#
+# Points are stored in progressive order (progressive_order: one point per occupied
+# voxel first, then the second per voxel, ...) and the .bin is a run of row chunks
+# growing from FIRST_CHUNK to MAX_CHUNK rows, each one complete for its rows:
+#   xyz      float32 [c*3]   projector coords centred and scaled into a cube of side
+#                             EXTENT (manifest["normalization"]), interleaved
+#   label    uint8   [c]     actual_label
+#   cluster  int16   [c]
+#   attrs    float32 [c*k]   tooltip attributes, row-major (names in manifest)
+#   id:<col> uint16/uint32 [c]  index into the shared string table, or for an integer
+#                             ID column (manifest["int_ids"]) the ID itself as uint32,
+#                             INT_ID_NONE where missing
+#   cat:<col> uint8  [c]     index into manifest["categories"][col]
+# followed by
+#   strings  uint8   [..]    deduplicated ID strings, utf-8, each NUL-terminated
+# so the viewer can draw a coarse cloud after the first few KB and refine it while the
+# rest streams in. manifest["columns"] gives each column's dtype/width, every chunk its
+# rows and byte offsets (4-byte aligned), manifest["bounds"] the min/max of the
+# normalized xyz. The viewer draws xyz as is; raw = xyz / scale + center.
+# The .bin is content-addressed (<stem>.<sha12>.bin, named in the manifest) so it can
+# be served immutable; only the small manifest needs revalidating. With an octree
+# (--lod) the same columns go into lod.py tiles instead and no .bin is written.
+
+import hashlib, json, re
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .lod import remove_lod
+
+BUNDLE_VERSION = 4
+FIRST_CHUNK = 1024      # rows in the first (coarse) chunk; later chunks double
+MAX_CHUNK = 1 << 16
+GRID = 16               # voxels per axis for progressive_order
+EXTENT = 100.0          # side of the cube the viewer draws in (world units)
+INT_ID_NONE = np.iinfo(np.uint32).max  # missing value of an integer ID column
+
+def _col(v) -> np.ndarray:
+    return v.to_numpy() if isinstance(v, (pd.Series, pd.Index)) else np.asarray(v)
+
+def _index_dtype(m: int):
+    return np.dtype("<u2") if m <= np.iinfo(np.uint16).max else np.dtype("<u4")
+
+def write_content_addressed(stem: Path, data: bytes, suffix=".bin") -> Path:
+    """Write <stem>.<sha12><suffix> and remove older versions (and their .gz/.br)."""
+    path = stem.with_name(f"{stem.name}.{hashlib.sha256(data).hexdigest()[:12]}{suffix}")
+    remove_content_addressed(stem, suffix, keep=path)
+    path.write_bytes(data)
+    return path
+
+def remove_content_addressed(stem: Path, suffix=".bin", keep=None):
+    """Delete every <stem>[.<sha12>]<suffix> (and .gz/.br) but `keep`."""
+    stale = re.compile(rf"^{re.escape(stem.name)}(\.[0-9a-f]{{12}})?{re.escape(suffix)}(\.gz|\.br)?$")
+    for old in stem.parent.glob(f"{stem.name}*{suffix}*"):
+        if stale.match(old.name) and (keep is None or old.name != keep.name):
+            old.unlink(missing_ok=True)
+
+def normalization(xyz: np.ndarray, extent=EXTENT) -> dict:
+    """Centre (bounding-box midpoint) and uniform scale that fit xyz into a cube of side
+    `extent`; JSON-ready, stored as manifest["normalization"]."""
+    xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+    lo, hi = (xyz.min(axis=0), xyz.max(axis=0)) if len(xyz) else (np.zeros(3), np.zeros(3))
+    span = float(np.max(hi - lo))
+    return {"center": ((lo + hi) / 2).tolist(), "scale": extent / span if span > 0 else 1.0, "extent": extent}
+
+def normalize(xyz: np.ndarray, norm: dict) -> np.ndarray:
+    """(xyz - center) * scale as float32."""
+    xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+    return ((xyz - np.asarray(norm["center"])) * norm["scale"]).astype("<f4")
+
+def progressive_order(xyz: np.ndarray, grid=GRID, seed=0) -> np.ndarray:
+    """Row order whose every prefix is a spatially even subsample: rows are ranked within
+    their voxel of a grid^3 lattice (random order inside a voxel) and sorted by that rank,
+    so sparse regions show up in the first chunk instead of last."""
+    xyz = np.asarray(xyz, dtype=float)
+    n = len(xyz)
+    if n == 0:
+        return np.arange(0)
+    lo, span = xyz.min(axis=0), np.ptp(xyz, axis=0)
+    cell = np.minimum((xyz - lo) / np.where(span > 0, span, 1) * grid, grid - 1).astype(np.int64)
+    voxel = (cell[:, 0] * grid + cell[:, 1]) * grid + cell[:, 2]
+    shuffle = np.random.default_rng(seed).permutation(n)
+    by_voxel = np.argsort(voxel[shuffle], kind="stable")
+    v = voxel[shuffle][by_voxel]
+    starts = np.flatnonzero(np.r_[True, v[1:] != v[:-1]])
+    rank = np.empty(n, dtype=np.int64)
+    rank[by_voxel] = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+    return shuffle[np.argsort(rank, kind="stable")]
+
+def take_rows(columns: dict, order) -> dict:
+    """Same columns, rows reordered."""
+    return {k: _col(v)[order] for k, v in columns.items()}
+
+def chunk_rows(n: int, first=FIRST_CHUNK, cap=MAX_CHUNK):
+    """[(start, count)] with count doubling from `first` up to `cap`."""
+    out, start, size = [], 0, first
+    while start < n:
+        out.append((start, min(size, n - start)))
+        start, size = start + size, min(2 * size, cap)
+    return out
+
+def int_ids(v):
+    """(uint32 codes, missing string) of an ID column whose values are all plain decimal
+    integers below INT_ID_NONE (so str() of the code gives the value back) except for
+    one missing-value string; None otherwise.
+
+    >>> int_ids(["261136679", "nan", "7"])
+    (array([ 261136679, 4294967295,          7], dtype=uint32), 'nan')
+    >>> int_ids(["261136679.0", "7.0", "nan"]) is None
+    True
+    """
+    s = pd.Series(_col(v).astype(str), dtype=object)
+    num = s.str.fullmatch(r"0|[1-9][0-9]{0,9}").to_numpy(dtype=bool)
+    other = pd.unique(s[~num])
+    if not num.any() or len(other) > 1:
+        return None
+    vals = s[num].astype(np.int64).to_numpy()
+    if vals.max() >= INT_ID_NONE:
+        return None
+    codes = np.full(len(s), INT_ID_NONE, dtype="<u4")
+    codes[num] = vals
+    return codes, str(other[0]) if len(other) else ""
+
+class _Writer:
+    def __init__(self):
+        self.blocks, self.size = [], 0
+
+    def add(self, arr: np.ndarray) -> dict:
+        arr = np.ascontiguousarray(arr)
+        pad = (-self.size) % 4
+        if pad:
+            self.blocks.append(b"\0" * pad)
+            self.size += pad
+        spec = {"dtype": arr.dtype.name, "offset": self.size, "length": int(arr.size)}
+        self.blocks.append(arr.tobytes())
+        self.size += arr.nbytes
+        return spec
+
+def write_bundle(stem, columns: dict, label_names: dict, attrs=(), ids=(), categories=(), tree=None, norm=None):
+    """Write <stem>.<hash>.bin + <stem>.manifest.json from packaged point columns
+    (already in display order: progressive_order, or tree.order when `tree` is an
+    lod.Octree, whose tiles are then written instead of the .bin and named in
+    manifest["lod"]; returns (None, manifest) then). Outputs of the other mode are removed.
+    `norm` (see normalization) defaults to the bounding box of the columns' xyz."""
+    stem = Path(stem)
+    manifest_path = stem.with_name(stem.name + ".manifest.json")
+
+    # whole columns first (n rows each), then cut into chunks
+    n = len(_col(columns["x"]))
+    cols = {}
+    xyz = np.column_stack([_col(columns[k]) for k in ("x", "y", "z")]).reshape(n, 3)
+    norm = norm or normalization(xyz)
+    cols["xyz"] = xyz = normalize(xyz, norm)
+    cols["label"] = _col(columns["actual_label"]).astype("<u1")
+    cl = _col(columns["cluster"]).astype(np.int64)
+    if n and (cl.min() < np.iinfo(np.int16).min or cl.max() > np.iinfo(np.int16).max):
+        raise ValueError("cluster ids do not fit int16")
+    cols["cluster"] = cl.astype("<i2")
+
+    attrs = list(attrs)
+    cols["attrs"] = np.column_stack([_col(columns[a]).astype("<f4") for a in attrs]) if attrs else np.empty((n, 0), "<f4")
+
+    # integer IDs (TIC, KIC) as uint32 columns; the rest share one string table
+    # (pd.factorize dedupes)
+    ids = list(ids)
+    as_int = {c: got for c in ids if (got := int_ids(columns[c])) is not None}
+    str_ids = [c for c in ids if c not in as_int]
+    codes, table = pd.factorize(pd.Series(np.concatenate([_col(columns[c]).astype(str) for c in str_ids]) if str_ids else [], dtype=object))
+    idx_dtype = _index_dtype(len(table))
+    for c in ids:
+        j = str_ids.index(c) if c in str_ids else None
+        cols[f"id:{c}"] = as_int[c][0] if j is None else codes[j * n:(j + 1) * n].astype(idx_dtype)
+    ints = {c: missing for c, (_, missing) in as_int.items()}
+
+    cats = {}
+    for c in categories:
+        ccodes, uniq = pd.factorize(pd.Series(_col(columns[c])))
+        if len(uniq) > np.iinfo(np.uint8).max:
+            raise ValueError(f"too many categories in {c!r} for uint8")
+        cols[f"cat:{c}"] = ccodes.astype("<u1")
+        cats[c] = [str(u) for u in uniq]
+
+    w = _Writer()
+    chunks = []
+    for start, count in chunk_rows(n) if tree is None else ():
+        offsets = {name: w.add(a[start:start + count])["offset"] for name, a in cols.items()}
+        chunks.append({"start": start, "count": count, "end": w.size, "arrays": offsets})
+
+    # NUL-terminated utf-8; the viewer recovers offsets with one scan of the
+    # block, which is cheaper to ship than a uint32 offset per string
+    if any("\0" in str(t) for t in table):
+        raise ValueError("ID strings may not contain NUL")
+    blob = b"".join(str(t).encode("utf-8") + b"\0" for t in table)
+    strings = {"count": len(table)}
+    if tree is None:
+        strings["data"] = w.add(np.frombuffer(blob, dtype=np.uint8))
+
+    manifest = {
+        "format": "embed3d-points",
+        "version": BUNDLE_VERSION,
+        "count": n,
+        "bin": None,
+        "bytes": w.size,
+        "bounds": [xyz.min(axis=0).tolist(), xyz.max(axis=0).tolist()] if n else [[0, 0, 0], [0, 0, 0]],
+        "normalization": norm,
+        "label_names": {str(k): v for k, v in label_names.items()},
+        "label_counts": {str(k): int(v) for k, v in zip(*np.unique(cols["label"], return_counts=True))},
+        "attrs": attrs,
+        "ids": ids,
+        "int_ids": ints,
+        "categories": cats,
+        "columns": {name: {"dtype": a.dtype.name, "width": int(np.prod(a.shape[1:]))} for name, a in cols.items()},
+        "chunks": chunks,
+        "strings": strings,
+    }
+    if tree is not None:  # the tiles hold every row: no flat .bin
+        manifest["lod"] = tree.write(stem, cols, blob, len(table)).name
+        remove_content_addressed(stem)
+        bin_path = None
+    else:
+        remove_lod(stem)
+        bin_path = write_content_addressed(stem, b"".join(w.blocks))
+        manifest["bin"] = bin_path.name
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return bin_path, manifest_path
@@ -0,0 +1,103 @@
+# clustering.py
+# unsupervised cluster ids for the 3D coords
+#
+#   auto      HDBSCAN if installed, else KMeans (the original behaviour)
+#   hdbscan   Boruvka KD-tree HDBSCAN, core distances on n_jobs threads
+#   kmeans    KMeans(n_init=10)
+#   minibatch MiniBatchKMeans streamed through partial_fit in batch_size chunks
+# With sample > 0 the clusterer is fitted on a random subsample and the remaining
+# rows are assigned afterwards (predict / approximate_predict), in chunks.
+
+import math
+from functools import lru_cache
+import numpy as np
+
+CLUSTERERS = {}   # name -> fn(coords, seed, min_cluster_size, k, n_jobs, batch_size, fit_only) -> (labels, label, assign)
+
+def register_clusterer(name):
+    def deco(fn):
+        CLUSTERERS[name] = fn
+        return fn
+    return deco
+
+def default_k(n: int, k_cap: int) -> int:
+    return min(k_cap, max(2, int(round(math.sqrt(n) / 4))))
+
+def _chunks(n: int, size: int):
+    for s in range(0, n, size):
+        yield slice(s, min(n, s + size))
+
+@register_clusterer("hdbscan")
+def _hdbscan(coords, seed, min_cluster_size, k, n_jobs, batch_size, fit_only):
+    import hdbscan
+    min_sz = min_cluster_size or max(10, len(coords)//50)
+    clusterer = hdbscan.HDBSCAN(
+        min_cluster_size=min_sz, algorithm="boruvka_kdtree",
+        core_dist_n_jobs=n_jobs, prediction_data=fit_only,
+    )
+    labels = clusterer.fit_predict(coords)
+    assign = lambda X: hdbscan.approximate_predict(clusterer, X)[0]
+    return labels, f"HDBSCAN(min_cluster_size={min_sz}, boruvka)", assign
+
+@register_clusterer("kmeans")
+def _kmeans(coords, seed, min_cluster_size, k, n_jobs, batch_size, fit_only):
+    from sklearn.cluster import KMeans
+    km = KMeans(n_clusters=k, n_init=10, random_state=seed)
+    return km.fit_predict(coords), f"KMeans(k={k})", km.predict
+
+@register_clusterer("minibatch")
+def _minibatch(coords, seed, min_cluster_size, k, n_jobs, batch_size, fit_only, epochs=3):
+    from sklearn.cluster import MiniBatchKMeans
+    km = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, n_init=3, random_state=seed)
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        order = rng.permutation(len(coords))
+        for sl in _chunks(len(coords), max(batch_size, 3 * k)):
+            km.partial_fit(coords[order[sl]])
+    labels = np.concatenate([km.predict(coords[sl]) for sl in _chunks(len(coords), batch_size)]) if len(coords) else np.empty(0, int)
+    return labels, f"MiniBatchKMeans(k={k}, batch={batch_size})", km.predict
+
+@lru_cache(maxsize=None)
+def _has_hdbscan() -> bool:
+    # a real import, not just find_spec: an installed but broken build (e.g. compiled
+    # against another numpy) must resolve to KMeans before the cache key is made
+    try:
+        import hdbscan  # noqa: F401
+    except ImportError as e:
+        import importlib.util
+        if importlib.util.find_spec("hdbscan") is not None:
+            print(f"⚠️  hdbscan is installed but fails to import ({e}); using KMeans")
+        return False
+    return True
+
+def resolve_clusterer(method="auto") -> str:
+    """Clusterer that will actually run (for cache keys and fallbacks)."""
+    has_hdbscan = _has_hdbscan()
+    if method == "auto" or (method == "hdbscan" and not has_hdbscan):
+        return "hdbscan" if has_hdbscan else "kmeans"
+    return method
+
+def cluster(coords, method="auto", seed=42, min_cluster_size=None, n_clusters=None, k_cap=8,
+            n_jobs=-1, sample=0, batch_size=4096):
+    """Returns (labels, human-readable clusterer label)."""
+    coords = np.asarray(coords, dtype=float)
+    n = len(coords)
+    k = n_clusters or default_k(n, k_cap)
+    name = resolve_clusterer(method)
+    if method == "hdbscan" and name != "hdbscan":
+        print("⚠️  hdbscan unavailable; falling back to KMeans")
+    sub = sample and 0 < sample < n
+    if not sub:
+        # no fallback past resolve_clusterer: a failing HDBSCAN run (bad min_cluster_size,
+        # out of memory) is an error, not a silent KMeans under an "hdbscan" cache key
+        return CLUSTERERS[name](coords, seed, min_cluster_size, k, n_jobs, batch_size, False)[:2]
+
+    # subsample-then-assign: fit on `sample` random rows, label the rest chunk by chunk
+    idx = np.sort(np.random.default_rng(seed).choice(n, size=sample, replace=False))
+    fit_labels, label, assign = CLUSTERERS[name](coords[idx], seed, min_cluster_size, k, n_jobs, batch_size, True)
+    labels = np.empty(n, dtype=int)
+    labels[idx] = fit_labels
+    rest = np.setdiff1d(np.arange(n), idx)
+    for sl in _chunks(len(rest), batch_size):
+        labels[rest[sl]] = assign(coords[rest[sl]])
+    return labels, f"{label} on {sample:,}/{n:,} rows + assign"
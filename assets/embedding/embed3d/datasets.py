@@ -0,0 +1,139 @@
+# datasets.py
+# per-dataset configuration for the pipeline: which file, target column, features,
+# ID columns and label map, and how the points/viewer are written out.
+
+from dataclasses import dataclass, field, replace
+
+KOI_CSV  = "data/Kepler Object of Interest.csv"
+TESS_CSV = "data/TESS Project Candidates.csv"
+K2_CSV   = "data/K2 Planets and Candidates.csv"  # not bundled: download k2pandc (see make_comb_embedding.py)
+
+@dataclass(frozen=True)
+class Source:
+    """One input catalog."""
+    name: str                 # written to the "source" column (KOI / TESS)
+    path: str
+    target: str               # disposition column
+    features: tuple           # raw feature columns
+    ids: tuple                # ID columns carried through (absent ones become NaN)
+    labels: dict              # normalized disposition (strip().upper()) -> 1 positive / 0 negative
+    rename: dict = field(default_factory=dict)  # raw -> unified column name (combined mode)
+    units: dict = field(default_factory=dict)   # raw -> factor into the unified unit (combined mode)
+
+@dataclass(frozen=True)
+class DatasetConfig:
+    """A pipeline run: sources, output names and the per-point record layout."""
+    name: str
+    sources: tuple
+    stem: str                 # <stem>.json / .bin / .manifest.json / .search.*
+    viewer: str               # HTML file written to out_dir
+    template: str             # embed3d/templates/<template>
+    label_names: dict         # 1/0 -> actual_label_name
+    fields: tuple             # JSON record keys, in order
+    ids: tuple                # ID fields (bundle string table + search index)
+    attrs: dict               # attr field -> candidate columns (first present wins)
+    categories: tuple = ()
+    id_na: str = ""           # how a missing ID is written
+    k_cap: int = 8            # default KMeans k = min(k_cap, sqrt(n)/4)
+    cache_base: dict = field(default_factory=dict)  # extra artifact-key fields
+
+    @property
+    def paths(self):
+        return [s.path for s in self.sources]
+
+    def with_paths(self, **paths):
+        """Same config reading e.g. koi=... / tess=... from other files."""
+        return replace(self, sources=tuple(replace(s, path=paths.get(s.name.lower()) or s.path) for s in self.sources))
+
+# ---------------------------
+# Sources
+# ---------------------------
+KOI_FEATURES = ("koi_period", "koi_time0bk", "koi_duration", "koi_depth",
+                "koi_prad", "koi_teq", "koi_steff", "koi_slogg", "koi_srad", "koi_kepmag")
+KOI_FP_FLAGS = ("koi_fpflag_nt", "koi_fpflag_ss", "koi_fpflag_co", "koi_fpflag_ec")
+TESS_FEATURES = ("pl_orbper", "pl_trandurh", "pl_trandep", "pl_rade", "pl_eqt", "pl_insol",
+                 "st_teff", "st_logg", "st_rad", "st_tmag", "st_dist")
+
+KOI = Source("KOI", KOI_CSV, "koi_disposition", KOI_FEATURES + KOI_FP_FLAGS,
+             ("kepid", "kepler_name", "kepoi_name"), {"CONFIRMED": 1, "CANDIDATE": 0})
+TESS = Source("TESS", TESS_CSV, "tfopwg_disp", TESS_FEATURES,
+              ("toi", "tid", "tic", "toi_name"), {"CP": 1, "CF": 1, "PC": 0, "CN": 0})
+# NASA Exoplanet Archive k2pandc table (CSV without the leading # comment block)
+K2_FEATURES = ("pl_orbper", "pl_trandur", "pl_trandep", "pl_rade", "pl_eqt", "pl_insol",
+               "st_teff", "st_logg", "st_rad")
+K2 = Source("K2", K2_CSV, "disposition", K2_FEATURES,
+            ("pl_name", "epic_hostname"), {"CONFIRMED": 1, "CANDIDATE": 0})
+
+# unified schema for the combined map (shared features only)
+KOI_KEEP_MAP = {
+    "koi_period": "period", "koi_duration": "duration_hours", "koi_depth": "depth_ppm",
+    "koi_prad": "prad_re", "koi_teq": "teq_k",
+    "koi_steff": "st_teff", "koi_slogg": "st_logg", "koi_srad": "st_rad",
+}
+TESS_KEEP_MAP = {
+    "pl_orbper": "period", "pl_trandurh": "duration_hours", "pl_trandep": "depth_ppm",
+    "pl_rade": "prad_re", "pl_eqt": "teq_k",
+    "st_teff": "st_teff", "st_logg": "st_logg", "st_rad": "st_rad",
+}
+K2_KEEP_MAP = {
+    "pl_orbper": "period", "pl_trandur": "duration_hours", "pl_trandep": "depth_ppm",
+    "pl_rade": "prad_re", "pl_eqt": "teq_k",
+    "st_teff": "st_teff", "st_logg": "st_logg", "st_rad": "st_rad",
+}
+
+# survey name -> (source, raw -> unified column map, raw -> unit factor); a new survey
+# joins the combined map with one entry here
+SURVEYS = {
+    "koi":  (KOI, KOI_KEEP_MAP, {}),
+    "tess": (TESS, TESS_KEEP_MAP, {}),
+    "k2":   (K2, K2_KEEP_MAP, {"pl_trandep": 1e4}),  # archive depths are in %
+}
+COMBINED = {"both": ("koi", "tess"), "all": tuple(SURVEYS)}
+
+# ---------------------------
+# Datasets
+# ---------------------------
+_XYZ = ("x", "y", "z")
+
+KOI_MAP = DatasetConfig(
+    name="koi",
+    sources=(replace(KOI, ids=("kepid", "kepler_name")),),
+    stem="koi_tsne3d_points", viewer="viewer.html", template="koi.html",
+    label_names={0: "CANDIDATE", 1: "CONFIRMED"},
+    fields=_XYZ + ("kepid", "kepler_name", "actual_label", "actual_label_name", "cluster", "koi_prad", "koi_teq"),
+    ids=("kepid", "kepler_name"), attrs={"koi_prad": ("koi_prad",), "koi_teq": ("koi_teq",)},
+    id_na="nan", k_cap=8, cache_base={"features": list(KOI.features)},
+)
+
+TESS_MAP = DatasetConfig(
+    name="tess",
+    sources=(replace(TESS, ids=("toi", "tid"), labels={"CP": 1, "PC": 0}),),
+    stem="tess_tsne3d_points", viewer="viewer_tess.html", template="tess.html",
+    label_names={0: "PC", 1: "CP"},
+    fields=_XYZ + ("tid", "toi", "actual_label", "actual_label_name", "cluster", "pl_rade", "pl_eqt"),
+    ids=("tid", "toi"), attrs={"pl_rade": ("pl_rade",), "pl_eqt": ("pl_eqt",)},
+    id_na="nan", k_cap=8, cache_base={"features": list(TESS.features)},
+)
+
+def comb_map(dataset="both") -> DatasetConfig:
+    """Several surveys on the unified schema (a COMBINED name, e.g. both = KOI + TESS), or
+    one SURVEYS entry alone with its full feature set."""
+    names = COMBINED.get(dataset, (dataset,))
+    if len(names) == 1:
+        sources, features = (SURVEYS[dataset][0],), list(SURVEYS[dataset][0].features)
+    else:
+        sources = tuple(replace(SURVEYS[n][0], features=tuple(SURVEYS[n][1]), rename=SURVEYS[n][1], units=SURVEYS[n][2])
+                        for n in names)
+        features = {f"{n}_keep_map": SURVEYS[n][1] for n in names}
+        features.update({f"{n}_units": SURVEYS[n][2] for n in names if SURVEYS[n][2]})
+    # KOI + TESS IDs always (fixed viewer/search layout), then any other survey's
+    ids = tuple(dict.fromkeys(c for n in ("koi", "tess", *names) for c in SURVEYS[n][0].ids))
+    return DatasetConfig(
+        name="comb", sources=sources,
+        stem="tnsa_tsne3d_points", viewer="viewer_comb.html", template="comb.html",
+        label_names={0: "CANDIDATE", 1: "CONFIRMED"},
+        fields=_XYZ + ("source", "actual_label", "actual_label_name", "cluster") + ids + ("prad_re", "teq_k"),
+        ids=ids, categories=("source",),
+        attrs={"prad_re": ("prad_re", "koi_prad", "pl_rade"), "teq_k": ("teq_k", "koi_teq", "pl_eqt")},
+        k_cap=10, cache_base={"dataset": dataset, "features": features},
+    )
@@ -0,0 +1,80 @@
+# fit.py
+# one embedding configuration = projector + clusterer parameters + seed.
+# The make_*_embedding.py scripts and sweep.py both go through fit_key()/fit_embedding(),
+# so a layout fitted by a sweep worker is a cache hit for the script that packages it.
+
+import time
+from pathlib import Path
+
+from .artifacts import artifact_key
+from .store import write_store, open_store
+from .projectors import project, resolve_tsne_backend, TSNE_ITERS
+from .clustering import cluster, resolve_clusterer, CLUSTERERS
+from .profiling import stage
+
+FIT_FIELDS = ["projector", "tsne_backend", "perplexity", "n_neighbors", "min_dist",
+              "clusterer", "min_cluster_size", "n_clusters", "cluster_sample", "cluster_batch", "seed"]
+
+def add_fit_args(p):
+    """Projector/clusterer knobs shared by every script (and swept by sweep.py)."""
+    p.add_argument("--perplexity", type=float, default=None, help="t-SNE perplexity (default min(30, max(5, n/50)))")
+    p.add_argument("--n_neighbors", type=int, default=15, help="UMAP n_neighbors")
+    p.add_argument("--min_dist", type=float, default=0.1, help="UMAP min_dist")
+    p.add_argument("--min_cluster_size", type=int, default=None, help="HDBSCAN min_cluster_size (default max(10, n/50))")
+    p.add_argument("--n_clusters", type=int, default=None, help="KMeans/MiniBatchKMeans k (default min(cap, sqrt(n)/4))")
+    p.add_argument("--clusterer", choices=["auto"] + list(CLUSTERERS), default="auto",
+                   help="auto = HDBSCAN if installed, else KMeans")
+    p.add_argument("--cluster_sample", type=int, default=0,
+                   help="fit the clusterer on this many random rows, then assign the rest (0 = all rows)")
+    p.add_argument("--cluster_batch", type=int, default=4096, help="MiniBatchKMeans batch / assignment chunk size")
+
+def fit_config(args) -> dict:
+    cfg = {f: getattr(args, f) for f in FIT_FIELDS}
+    cfg["projector"] = cfg["projector"].lower()
+    return cfg
+
+def fit_key(inputs, X, base: dict, cfg: dict, k_cap: int) -> str:
+    # only the knobs the chosen projector reads, so e.g. --perplexity does not split PCA entries
+    proj = cfg["projector"]
+    clus = resolve_clusterer(cfg["clusterer"])
+    params = {"projector": proj, "seed": cfg["seed"], "k_cap": k_cap,
+              "min_cluster_size": cfg["min_cluster_size"], "n_clusters": cfg["n_clusters"],
+              "clusterer": clus, "cluster_sample": cfg["cluster_sample"] or 0}
+    if clus == "minibatch" or cfg["cluster_sample"]:
+        params["cluster_batch"] = cfg["cluster_batch"]
+    if proj == "tsne":
+        params.update(tsne_backend=resolve_tsne_backend(cfg["tsne_backend"]), tsne_iters=TSNE_ITERS,
+                      perplexity=cfg["perplexity"])
+    elif proj == "umap":
+        params.update(n_neighbors=cfg["n_neighbors"], min_dist=cfg["min_dist"])
+    return artifact_key(inputs, X, **base, **params)
+
+def fit_embedding(X_scaled, cfg: dict, k_cap: int, n_jobs: int = -1):
+    """Returns (coords, clabels, projector label, clusterer label, {stage: seconds})."""
+    t0 = time.perf_counter()
+    with stage("project"):
+        coords, projector_used = project(
+            X_scaled, cfg["projector"], tsne_backend=cfg["tsne_backend"], seed=cfg["seed"], n_jobs=n_jobs,
+            perplexity=cfg["perplexity"], n_neighbors=cfg["n_neighbors"], min_dist=cfg["min_dist"],
+        )
+    t1 = time.perf_counter()
+    with stage("cluster"):
+        clabels, clustering_used = cluster(
+            coords, cfg["clusterer"], seed=cfg["seed"], min_cluster_size=cfg["min_cluster_size"],
+            n_clusters=cfg["n_clusters"], k_cap=k_cap, n_jobs=n_jobs,
+            sample=cfg["cluster_sample"], batch_size=cfg["cluster_batch"],
+        )
+    timings = {"project_s": round(t1 - t0, 3), "cluster_s": round(time.perf_counter() - t1, 3)}
+    return coords, clabels, projector_used, clustering_used, timings
+
+# ---------------------------
+# Shared matrix hand-off (script --export_matrix -> sweep.py), as a store.py directory
+# ---------------------------
+def export_matrix(path, X, X_scaled, inputs, base: dict, k_cap: int, art_dir) -> Path:
+    meta = {"inputs": [str(Path(f).resolve()) for f in inputs], "base": base, "k_cap": k_cap, "art_dir": str(art_dir)}
+    return write_store(path, {"X": X, "X_scaled": X_scaled}, meta)
+
+def import_matrix(path, mmap_mode="r"):
+    """Returns (X, X_scaled, meta), the arrays memory-mapped."""
+    arrays, meta = open_store(path, ["X", "X_scaled"], mmap_mode=mmap_mode)
+    return arrays["X"], arrays["X_scaled"], meta
@@ -0,0 +1,42 @@
+# harmonize.py
+# one source's raw columns -> the unified frame load() / load_stream() concatenate
+#
+# Everything per-survey is declared on its Source (datasets.py): the features to keep
+# and their unified names (rename), unit factors (units), the ID columns carried along
+# and the disposition vocabulary (labels). The disposition column is handled as a
+# pandas categorical, so strip/upper and the label lookup run once per distinct value
+# and reach the rows through the integer codes; "source" is a categorical too.
+
+import numpy as np
+import pandas as pd
+
+from .datasets import Source
+
+def label_codes(s: pd.Series, labels: dict) -> np.ndarray:
+    """labels[str(v).strip().upper()] per value as float (NaN = not in the vocabulary)."""
+    cat = s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    lookup = cat.cat.categories.astype(str).str.strip().str.upper().map(labels).to_numpy(dtype=float)
+    codes = cat.cat.codes.to_numpy()
+    return np.where(codes >= 0, lookup[codes] if len(lookup) else np.nan, np.nan)
+
+def source_column(name: str, n: int, names) -> pd.Categorical:
+    """`name` n times, over the vocabulary of every source in the run (so concat keeps it categorical)."""
+    names = list(names)
+    return pd.Categorical.from_codes(np.full(n, names.index(name), dtype=np.int8), categories=names)
+
+def harmonize(raw: pd.DataFrame, src: Source, source_names=None) -> pd.DataFrame:
+    """Features (numeric, renamed, in unified units), src.ids (absent ones NaN), "source"
+    and "label" (1/0, NaN if the disposition is not in src.labels), on raw's index."""
+    missing = [c for c in [src.target, *src.features] if c not in raw.columns]
+    if missing:
+        raise KeyError(f"{src.name} missing required columns: {missing}")
+    out = {}
+    for c in src.features:
+        v = pd.to_numeric(raw[c], errors="coerce")
+        out[src.rename.get(c, c)] = v * src.units[c] if c in src.units else v
+    for c in src.ids:
+        out[c] = raw[c] if c in raw.columns else np.nan
+    df = pd.DataFrame(out, index=raw.index)
+    df["source"] = source_column(src.name, len(df), source_names or [src.name])
+    df["label"] = label_codes(raw[src.target], src.labels)
+    return df
@@ -0,0 +1,123 @@
+# ingest.py
+# column-projected CSV/XLSX loading + content-hash keyed columnar cache
+#
+# Repeat runs on an unchanged file skip CSV parsing entirely: the projected
+# frame is stored under <data dir>/.cache keyed on (file bytes, columns, dtypes).
+# iter_table() is the streaming counterpart for files bigger than memory: the same
+# projection, one chunk of rows at a time, no cache.
+
+import hashlib, json
+from pathlib import Path
+import pandas as pd
+
+CACHE_VERSION = 1
+CACHE_DIRNAME = ".cache"
+
+# ---------------------------
+# Hashing
+# ---------------------------
+def file_sha256(path, chunk_size=1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def cache_key(content_hash: str, columns, dtypes=None) -> str:
+    spec = {
+        "v": CACHE_VERSION,
+        "data": content_hash,
+        "columns": sorted(columns),
+        "dtypes": {k: str(v) for k, v in sorted((dtypes or {}).items())},
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+# ---------------------------
+# Cache backends (Feather via pyarrow -> pandas pickle)
+# ---------------------------
+def _cache_write(df: pd.DataFrame, stem: Path) -> Path:
+    try:
+        import pyarrow  # noqa: F401
+        out = stem.with_suffix(".feather")
+        df.reset_index(drop=True).to_feather(out)
+    except Exception:
+        out = stem.with_suffix(".pkl")
+        df.to_pickle(out)
+    return out
+
+def _cache_read(stem: Path):
+    feather = stem.with_suffix(".feather")
+    if feather.exists():
+        try:
+            return pd.read_feather(feather)
+        except Exception:
+            pass
+    pkl = stem.with_suffix(".pkl")
+    if pkl.exists():
+        try:
+            return pd.read_pickle(pkl)
+        except Exception:
+            pass
+    return None
+
+# ---------------------------
+# Parsing
+# ---------------------------
+def _parse(path: Path, wanted: set, dtypes: dict) -> pd.DataFrame:
+    # usecols sees the raw header, so match on the stripped name
+    usecols = lambda c: str(c).strip() in wanted
+    ext = path.suffix.lower()
+    if ext in (".xls", ".xlsx"):
+        df = pd.read_excel(path, usecols=usecols)
+    else:
+        try:
+            df = pd.read_csv(path, usecols=usecols, dtype=dtypes or None)
+        except (ValueError, TypeError):
+            # a column didn't fit its declared dtype; let pandas infer and
+            # leave coercion to the caller's pd.to_numeric(errors="coerce")
+            df = pd.read_csv(path, usecols=usecols)
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+def iter_table(path, columns, chunk_rows: int):
+    """Yield `columns` of a CSV in frames of up to chunk_rows rows. Types are inferred
+    per chunk (the caller coerces); XLSX cannot be streamed and comes as one frame."""
+    path = Path(path)
+    wanted = set(columns)
+    usecols = lambda c: str(c).strip() in wanted
+    if path.suffix.lower() in (".xls", ".xlsx"):
+        chunks = [pd.read_excel(path, usecols=usecols)]
+    else:
+        chunks = pd.read_csv(path, usecols=usecols, chunksize=chunk_rows)
+    for df in chunks:
+        df.columns = df.columns.astype(str).str.strip()
+        yield df
+
+def count_lines(path, chunk_size=1 << 20) -> int:
+    """Newlines in a file: an upper bound on its CSV rows, without parsing."""
+    with open(path, "rb") as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(chunk_size), b""))
+
+def read_table(path, columns, dtypes=None, cache_dir=None, use_cache=True) -> pd.DataFrame:
+    """Load only `columns` from a CSV/XLSX (missing ones are simply absent)."""
+    path = Path(path)
+    wanted = set(columns)
+    dtypes = {c: t for c, t in (dtypes or {}).items() if c in wanted}
+    if not use_cache:
+        return _parse(path, wanted, dtypes)
+
+    cache_dir = Path(cache_dir) if cache_dir else path.parent / CACHE_DIRNAME
+    key = cache_key(file_sha256(path), wanted, dtypes)
+    stem = cache_dir / f"{path.stem}-{key}"
+
+    df = _cache_read(stem)
+    if df is not None:
+        return df
+
+    df = _parse(path, wanted, dtypes)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _cache_write(df, stem)
+    except OSError:
+        pass  # read-only checkout: still return the parsed frame
+    return df
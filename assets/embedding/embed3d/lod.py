@@ -0,0 +1,140 @@
+# lod.py
+# octree level-of-detail tiles for catalogs too big to draw whole (--lod)
+#
+# The bounding cube of the viewer-space coords (bundle.normalize) is split as an octree. Every row lives in exactly
+# one node: a node keeps up to `capacity` representative rows (spread evenly over a
+# grid^3 sub-lattice of its cube, random within a sub-cell) and passes the rest down to
+# its eight children, so parent + children together are the full-resolution cloud.
+# Rows are renumbered breadth-first, making every node a contiguous row range of the
+# bundle; each node is written as its own tile in the bundle's chunk layout:
+#
+#   <stem>.lod.json               cube, columns, per-node cell/rows/subtree count/children/tile
+#   <stem>.lod/<node>.<sha12>.bin one chunk per node (node ids: "r", "r0".."r7", "r00", ...)
+#   <stem>.lod/strings.<sha12>.bin  the ID string table, fetched once in the background
+#
+# The viewer fetches the root, then only the nodes whose projected size on screen is
+# large enough, within a fixed point budget, so frame time stays bounded however large
+# the catalog is.
+
+import json, shutil
+from pathlib import Path
+import numpy as np
+
+LOD_VERSION = 1
+LOD_CAPACITY = 8192      # rows per node
+LOD_GRID = 8             # sub-cells per axis used to pick a node's representatives
+LOD_MAX_DEPTH = 12       # the deepest level takes whatever is left (e.g. duplicates)
+LOD_MIN_ROWS = 200_000   # --lod auto switches on at this many rows
+
+class Octree:
+    """Node layout over rows 0..n-1; `order` maps new (breadth-first) row -> input row."""
+    def __init__(self, center, half, order, levels, cells, starts, counts):
+        self.center, self.half, self.order = center, half, order
+        self.levels, self.cells, self.starts, self.counts = levels, cells, starts, counts
+        self.children = [[] for _ in levels]
+        index = {(int(l), *map(int, c)): k for k, (l, c) in enumerate(zip(levels, cells))}
+        for k, (l, c) in enumerate(zip(levels, cells)):
+            if l:
+                self.children[index[(int(l) - 1, *(int(v) >> 1 for v in c))]].append(k)
+        self.totals = counts.astype(np.int64).copy()
+        for k in range(len(levels) - 1, -1, -1):  # children always come after their parent
+            self.totals[k] += sum(int(self.totals[c]) for c in self.children[k])
+
+    def node_id(self, k) -> str:
+        l, c = int(self.levels[k]), self.cells[k]
+        return "r" + "".join(str(((int(c[0]) >> s & 1) << 2) | ((int(c[1]) >> s & 1) << 1) | (int(c[2]) >> s & 1))
+                             for s in range(l - 1, -1, -1))
+
+    def write(self, stem: Path, cols: dict, strings: bytes, n_strings: int) -> Path:
+        """Tiles + <stem>.lod.json from bundle columns already in self.order; returns the json path."""
+        from .bundle import _Writer, write_content_addressed
+        tile_dir = stem.with_name(stem.name + ".lod")
+        tile_dir.mkdir(exist_ok=True)
+        written, nodes = set(), []
+        for k in range(len(self.levels)):
+            start, count = int(self.starts[k]), int(self.counts[k])
+            w = _Writer()
+            offsets = {name: w.add(a[start:start + count])["offset"] for name, a in cols.items()}
+            path = write_content_addressed(tile_dir / self.node_id(k), b"".join(w.blocks))
+            written.add(path.name)
+            nodes.append({"id": self.node_id(k), "level": int(self.levels[k]), "cell": [int(v) for v in self.cells[k]],
+                          "start": start, "count": count, "total": int(self.totals[k]),
+                          "children": self.children[k], "bin": path.name, "arrays": offsets})
+        strings_path = write_content_addressed(tile_dir / "strings", strings)
+        written.add(strings_path.name)
+        for f in tile_dir.iterdir():  # nodes that no longer exist
+            if f.name.removesuffix(".gz").removesuffix(".br") not in written:
+                f.unlink()
+
+        out = stem.with_name(stem.name + ".lod.json")
+        out.write_text(json.dumps({
+            "format": "embed3d-lod", "version": LOD_VERSION,
+            "count": int(self.totals[0]) if nodes else 0,
+            "cube": {"center": self.center.tolist(), "half": float(self.half)},
+            "tiles": tile_dir.name + "/",
+            "strings": {"bin": strings_path.name, "count": n_strings},
+            "nodes": nodes,
+        }), encoding="utf-8")
+        return out
+
+    def files(self, stem: Path) -> list:
+        tile_dir = stem.with_name(stem.name + ".lod")
+        return [stem.with_name(stem.name + ".lod.json")] + sorted(
+            f for f in tile_dir.iterdir() if f.suffix == ".bin")
+
+def remove_lod(stem: Path):
+    """Delete <stem>.lod.json (+ .gz/.br) and <stem>.lod/, left from an earlier --lod build."""
+    stem = Path(stem)
+    for suffix in ("", ".gz", ".br"):
+        stem.with_name(stem.name + ".lod.json" + suffix).unlink(missing_ok=True)
+    shutil.rmtree(stem.with_name(stem.name + ".lod"), ignore_errors=True)
+
+def build_octree(xyz, capacity=LOD_CAPACITY, grid=LOD_GRID, max_depth=LOD_MAX_DEPTH, seed=0) -> Octree:
+    """Assign every row to a node, top-down, one vectorized pass per level."""
+    xyz = np.asarray(xyz, dtype=float)
+    n = len(xyz)
+    lo, hi = (xyz.min(axis=0), xyz.max(axis=0)) if n else (np.zeros(3), np.zeros(3))
+    center, half = (lo + hi) / 2, float(np.max(hi - lo)) / 2 or 1.0
+    corner = center - half
+    tiebreak = np.random.default_rng(seed).random(n)
+
+    rem, level = np.arange(n), 0
+    order, levels, cells, starts, counts = [], [], [], [], []
+    while rem.size:
+        side = 2 ** level
+        u = (xyz[rem] - corner) / (2 * half) * side         # position in node units at this level
+        cell = np.clip(np.floor(u), 0, side - 1).astype(np.int64)
+        key = (cell[:, 0] * side + cell[:, 1]) * side + cell[:, 2]
+        if level < max_depth:
+            sub = np.clip(np.floor((u - cell) * grid), 0, grid - 1).astype(np.int64)
+            sub = (sub[:, 0] * grid + sub[:, 1]) * grid + sub[:, 2]
+            # rank inside (node, sub-cell), then take the lowest ranks of each node first
+            o = np.lexsort((tiebreak[rem], sub, key))
+            ks = key[o] * grid ** 3 + sub[o]
+            first = np.flatnonzero(np.r_[True, ks[1:] != ks[:-1]])
+            rank = np.empty(rem.size, dtype=np.int64)
+            rank[o] = np.arange(rem.size) - np.repeat(first, np.diff(np.r_[first, rem.size]))
+        else:
+            rank = np.zeros(rem.size, dtype=np.int64)
+        o = np.lexsort((tiebreak[rem], rank, key))
+        k_sorted = key[o]
+        first = np.flatnonzero(np.r_[True, k_sorted[1:] != k_sorted[:-1]])
+        pos = np.arange(rem.size) - np.repeat(first, np.diff(np.r_[first, rem.size]))
+        take = pos < capacity if level < max_depth else np.ones(rem.size, dtype=bool)
+
+        taken = o[take]
+        tk = key[taken]
+        bounds = np.flatnonzero(np.r_[True, tk[1:] != tk[:-1], True])
+        base = sum(len(r) for r in order)
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            levels.append(level)
+            cells.append(cell[taken[a]])
+            starts.append(base + a)
+            counts.append(b - a)
+        order.append(rem[taken])
+        rem = rem[o[~take]]
+        level += 1
+
+    return Octree(center, half, np.concatenate(order) if order else np.arange(0),
+                  np.asarray(levels, dtype=np.int64), np.asarray(cells, dtype=np.int64).reshape(-1, 3),
+                  np.asarray(starts, dtype=np.int64), np.asarray(counts, dtype=np.int64))
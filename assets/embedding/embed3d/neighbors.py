@@ -0,0 +1,107 @@
+# neighbors.py
+# "similar objects": top-k nearest neighbors of every row, in two spaces
+#
+#   features  X_scaled, the standardized features the projector saw
+#   xyz       coords, the 3D layout (what looks close in the viewer)
+#
+# A KD-tree per space (sklearn, as in oos.py) gives exact lists, written as a store.py
+# directory <stem>.neighbors/:
+#   <space>.idx   uint16/uint32 [n, k]  neighbor rows, nearest first, the row itself excluded
+#   <space>.dist  float32 [n, k]        euclidean distance in that space
+#   <space>.vec   float32 [n, d]        the vectors, for filtered queries
+#   col.<name>    bytes [n]             ID columns, source and label name per row (utf-8)
+# Unfiltered lookups read one row of the mapped lists. Filtered ones ("only confirmed
+# KOIs") build a KD-tree over the matching rows, milliseconds at catalog sizes, kept
+# per filter for the rest of a batch.
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .bundle import _index_dtype
+from .search import normalize_key, normalize_query, int_id, MISSING
+from .store import write_store, open_store
+
+NEIGHBORS_K = 10
+SPACES = ("features", "xyz")
+
+def knn_lists(X, k=NEIGHBORS_K, n_jobs=-1):
+    """(idx [n, k], dist [n, k]) of every row's k nearest other rows, nearest first."""
+    from sklearn.neighbors import NearestNeighbors
+    X = np.asarray(X, dtype=float)
+    n = len(X)
+    k = min(k, n - 1)
+    dist, idx = NearestNeighbors(n_neighbors=k + 1, algorithm="kd_tree", n_jobs=n_jobs).fit(X).kneighbors(X)
+    # drop the row itself: column 0, except among exact duplicates where it can come later
+    own = idx == np.arange(n)[:, None]
+    own[~own.any(axis=1), -1] = True
+    return idx[~own].reshape(n, k).astype(_index_dtype(n)), dist[~own].reshape(n, k).astype(np.float32)
+
+def write_neighbors(path, spaces: dict, columns: dict, ids=(), k=NEIGHBORS_K, n_jobs=-1, meta=None) -> Path:
+    """spaces: {name: [n, d] vectors}; columns: {name: [n] values}, stored as strings
+    (`ids` names the ones NeighborIndex.rows matches queries against)."""
+    arrays = {}
+    for s, X in spaces.items():
+        idx, dist = knn_lists(X, k, n_jobs)
+        arrays.update({f"{s}.idx": idx, f"{s}.dist": dist, f"{s}.vec": np.asarray(X, dtype=np.float32)})
+    for c, v in columns.items():
+        arrays[f"col.{c}"] = np.char.encode(pd.Series(v).astype(str).to_numpy().astype(str), "utf-8")
+    n = len(next(iter(spaces.values())))
+    return write_store(path, arrays, {**(meta or {}), "rows": n, "k": min(k, n - 1), "spaces": list(spaces),
+                                      "columns": list(columns), "ids": list(ids)})
+
+class NeighborIndex:
+    """A <stem>.neighbors/ directory, memory-mapped."""
+
+    def __init__(self, path):
+        self.arrays, self.meta = open_store(path)
+        self.n, self.k = self.meta["rows"], self.meta["k"]
+        self._keys = None
+        self._trees = {}
+
+    def rows(self, query: str) -> list:
+        """Rows with an ID equal to `query` (case, whitespace and a TOI-/TIC/KIC prefix ignored)."""
+        if self._keys is None:
+            self._keys = {}
+            for c in self.meta["ids"]:
+                for i, v in enumerate(self.arrays[f"col.{c}"].tolist()):
+                    key = normalize_query(v.decode("utf-8"))
+                    if key not in MISSING:
+                        self._keys.setdefault(key, set()).add(i)
+        return sorted(self._keys.get(normalize_query(query), ()))
+
+    def record(self, i: int) -> dict:
+        return {c: self.arrays[f"col.{c}"][i].decode("utf-8") for c in self.meta["columns"]}
+
+    def name(self, i: int) -> str:
+        """Every non-empty ID of row i, e.g. "10797460 / Kepler-227 b / K00752.01"."""
+        rec = self.record(i)
+        return " / ".join(int_id(rec[c]) for c in self.meta["ids"] if normalize_key(rec[c]) not in MISSING) or "?"
+
+    def mask(self, **where):
+        """Rows whose columns equal the given values (case-insensitive; None = any), or None."""
+        m = None
+        for c, v in where.items():
+            if v is not None:
+                hit = np.char.lower(np.asarray(self.arrays[f"col.{c}"])) == str(v).lower().encode("utf-8")
+                m = hit if m is None else m & hit
+        return m
+
+    def neighbors(self, i: int, space="features", k=None, mask=None):
+        """(rows, distances) nearest to row i in `space`, i excluded; only `mask` rows if given."""
+        k = k or self.k
+        if mask is None and k <= self.k:
+            return self.arrays[f"{space}.idx"][i, :k].astype(int), np.asarray(self.arrays[f"{space}.dist"][i, :k])
+        vec = self.arrays[f"{space}.vec"]
+        key = (space, None if mask is None else np.packbits(mask).tobytes())
+        if key not in self._trees:
+            from sklearn.neighbors import KDTree
+            rows = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+            self._trees[key] = (rows, KDTree(np.asarray(vec, dtype=float)[rows]) if len(rows) else None)
+        rows, tree = self._trees[key]
+        if tree is None:
+            return np.empty(0, dtype=int), np.empty(0, dtype=np.float32)
+        dist, j = tree.query(np.asarray(vec[i:i + 1], dtype=float), k=min(k + 1, len(rows)))
+        nb, d = rows[j[0]], dist[0]
+        keep = nb != i
+        return nb[keep][:k], d[keep][:k].astype(np.float32)
@@ -0,0 +1,76 @@
+# oos.py
+# out-of-sample placement: persist the fitted scaler + reference embedding, then
+# drop new rows into the existing 3D map by distance-weighted kNN interpolation
+# (no refit, so the layout of already-placed rows never moves).
+
+import pickle
+from pathlib import Path
+import numpy as np
+
+MODEL_VERSION = 1
+
+# ---------------------------
+# Model (plain dict, pickled)
+# ---------------------------
+def build_model(scaler, X_ref, coords, clabels, keys, features, **meta) -> dict:
+    """Reference rows of a full fit: scaler, X_scaled, coords, clusters, row keys."""
+    from sklearn.neighbors import NearestNeighbors
+    X_ref = np.asarray(X_ref, dtype=float)
+    return {
+        "version": MODEL_VERSION,
+        "features": list(features),
+        "scaler": scaler,
+        "nn": NearestNeighbors().fit(X_ref),
+        "ref_coords": np.asarray(coords, dtype=float),
+        "ref_clusters": np.asarray(clabels).astype(int),
+        # every placed row (reference + transformed) by key -> (x, y, z, cluster)
+        "placed": {k: (*c, int(cl)) for k, c, cl in zip(keys, np.asarray(coords, dtype=float).tolist(), clabels)},
+        "meta": meta,
+    }
+
+def save_model(path, model: dict) -> Path:
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+    return path
+
+def load_model(path, features) -> dict:
+    with open(path, "rb") as f:
+        model = pickle.load(f)
+    if model.get("version") != MODEL_VERSION:
+        raise ValueError(f"{path}: model version {model.get('version')} != {MODEL_VERSION}; rerun without --transform")
+    if model["features"] != list(features):
+        raise ValueError(f"{path}: model was fitted on different features; rerun without --transform")
+    return model
+
+# ---------------------------
+# Placement
+# ---------------------------
+def place(model: dict, X_new_scaled, k: int = 10):
+    """Coords = inverse-distance weighted mean of the k nearest reference rows; cluster = weighted vote."""
+    X_new_scaled = np.asarray(X_new_scaled, dtype=float)
+    if not len(X_new_scaled):
+        return np.empty((0, 3)), np.empty(0, dtype=int)
+    k = min(k, len(model["ref_coords"]))
+    dist, idx = model["nn"].kneighbors(X_new_scaled, n_neighbors=k)
+    w = 1.0 / (dist + 1e-9)
+    w /= w.sum(axis=1, keepdims=True)
+    coords = np.einsum("nk,nkd->nd", w, model["ref_coords"][idx])
+    neigh = model["ref_clusters"][idx]
+    votes = {c: (w * (neigh == c)).sum(axis=1) for c in np.unique(neigh)}
+    cl = np.array(list(votes))[np.argmax(np.column_stack(list(votes.values())), axis=1)]
+    return coords, cl.astype(int)
+
+def layout(model: dict, keys, X_scaled, k: int = 10):
+    """Coords/clusters for every row: stored ones for known keys, kNN placement for the rest.
+    Newly placed rows are recorded in the model; returns (coords, clusters, n_new)."""
+    keys = list(keys)
+    placed = model["placed"]
+    new = np.array([key not in placed for key in keys], dtype=bool)
+    new_coords, new_cl = place(model, np.asarray(X_scaled)[new], k)
+    for key, c, cl in zip(np.asarray(keys, dtype=object)[new], new_coords.tolist(), new_cl):
+        placed[key] = (*c, int(cl))
+    rows = np.array([placed[key] for key in keys], dtype=float).reshape(len(keys), 4)
+    return rows[:, :3], rows[:, 3].astype(int), int(new.sum())
@@ -0,0 +1,436 @@
+# pipeline.py
+# the make_*_embedding.py stages as plain functions over a DatasetConfig (datasets.py):
+#
+#   load -> embed (scale + project + cluster, artifact cache) -> point_columns
+#        -> write_points (JSON + bundle + search index) -> write_viewer -> serve
+#
+# --watch hands the same stages to preview.py, which reruns only the stale ones.
+#
+# Every stage takes and returns plain values / the dataclasses below, so a stage can
+# be imported, cached, timed or swapped on its own; run() chains them for a CLI.
+
+import argparse, json, sys
+from dataclasses import dataclass, field
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .datasets import DatasetConfig
+from .ingest import read_table, iter_table, count_lines
+from .harmonize import harmonize
+from .points import package_points, id_strings, first_present, compact_frame
+from .bundle import write_bundle, progressive_order, take_rows, normalization, normalize
+from .lod import build_octree, LOD_MIN_ROWS
+from .search import write_search_index
+from .viewer import render_template
+from .projectors import TSNE_BACKENDS, TSNE_AUTO_ORDER
+from .artifacts import artifact_dir, load_artifacts, save_artifacts, matrix_digest, DEFAULT_MAX_BYTES
+from .fit import add_fit_args, fit_config, fit_key, fit_embedding, export_matrix
+from .store import write_store, read_meta
+from .neighbors import write_neighbors, NEIGHBORS_K
+from . import profiling
+from .profiling import stage
+from .serve import serve, precompress, ENCODERS
+from .preview import preview
+
+STREAM_CHUNK_ROWS = 100_000   # --stream default: rows parsed per chunk
+
+@dataclass
+class Table:
+    """Labelled rows that survived filtering, and their feature matrix."""
+    df: pd.DataFrame          # features + ID columns + "label" (1/0) + "source"
+    X: np.ndarray             # float64 [n, len(features)], rows of df (float32 when streamed)
+    y: np.ndarray             # int [n]
+    features: list
+    scaler: object = None     # StandardScaler fitted chunk by chunk (streamed), else None
+    lean: bool = False        # --lean: X is scaled in place by embed() (then scaled is True)
+    scaled: bool = False      # X already holds the scaled values, scaler the fitted scaler
+    digest: dict = None       # artifacts.matrix_digest of X before it was scaled in place
+
+@dataclass
+class Embedding:
+    X_scaled: np.ndarray
+    coords: np.ndarray        # [n, 3]
+    clabels: np.ndarray       # [n]
+    projector: str            # human-readable labels of what actually ran
+    clustering: str
+    key: str = ""             # artifact cache key ("" when not cacheable)
+    cached: bool = False
+    scaler: object = None     # fitted StandardScaler (None on a cache hit)
+    timings: dict = field(default_factory=dict)
+
+@dataclass
+class Outputs:
+    json: Path                # None with LOD tiles (like bin)
+    bin: Path
+    manifest: Path
+    search_bin: Path
+    search: Path
+    count: int
+    lod: list = field(default_factory=list)  # <stem>.lod.json + tiles, when written
+    search_shards: list = field(default_factory=list)  # <stem>.search/ trigram posting shards
+
+# ---------------------------
+# CLI
+# ---------------------------
+def add_common_args(p):
+    """Flags every dataset CLI shares (dataset paths are added by the script)."""
+    p.add_argument("--projector", choices=["tsne","umap","pca"], default="tsne", help="3D projector")
+    p.add_argument("--tsne_backend", "--tsne-backend", choices=["auto"] + list(TSNE_BACKENDS), default="auto",
+                   help="t-SNE implementation (auto = first installed of %s)" % ", ".join(TSNE_AUTO_ORDER))
+    p.add_argument("--n_jobs", "--n-jobs", type=int, default=-1, help="threads for the projector (-1 = all cores)")
+    add_fit_args(p)
+    p.add_argument("--out_dir", default=".", help="output folder for json/html")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--no_cache", action="store_true", help="always recompute (skip .cache: parsed CSVs + embeddings)")
+    p.add_argument("--stream", nargs="?", type=int, const=STREAM_CHUNK_ROWS, default=None, metavar="ROWS",
+                   help=f"chunked ingest for catalogs bigger than memory: float32 features, incremental "
+                        f"scaler, no parsed-CSV cache (ROWS per chunk, default {STREAM_CHUNK_ROWS:,})")
+    p.add_argument("--cache_max_mb", type=int, default=DEFAULT_MAX_BYTES >> 20, help="LRU size cap for cached embeddings")
+    p.add_argument("--lean", action="store_true",
+                   help="memory-lean: float32 C-contiguous features scaled in place, IDs as categoricals, "
+                        "feature frame dropped before projection; prints RSS after load and embed")
+    p.add_argument("--no_serve", action="store_true", help="write outputs and exit (no local server)")
+    p.add_argument("--watch", action="store_true",
+                   help="live preview: rebuild on data/config/template changes and push to open viewers "
+                        "(--knn/--store are rewritten on every refit; --profile is build-only)")
+    p.add_argument("--config", default=None, metavar="JSON",
+                   help="with --watch: fit parameters (projector, perplexity, ...) read from a file and watched")
+    p.add_argument("--no_precompress", action="store_true", help="skip writing .gz/.br variants of the outputs")
+    p.add_argument("--store", default=None, metavar="DIR",
+                   help="also write X_scaled/coords/labels as a memory-mapped .npy store (embed3d.store.open_store)")
+    p.add_argument("--knn", nargs="?", type=int, const=NEIGHBORS_K, default=None, metavar="K",
+                   help=f"also write every row's K nearest neighbors (feature space + 3D) to "
+                        f"<out_dir>/<stem>.neighbors/ for query_neighbors.py (default K {NEIGHBORS_K})")
+    p.add_argument("--lod", choices=["auto", "on", "off"], default="auto",
+                   help=f"octree level-of-detail tiles for the viewer (auto = from {LOD_MIN_ROWS:,} rows)")
+    p.add_argument("--export_matrix", default=None, help=argparse.SUPPRESS)  # sweep.py: dump X/X_scaled and exit
+    p.add_argument("--profile", nargs="?", const="", default=None, metavar="JSON",
+                   help="report wall/CPU time and peak RSS per stage (JSON default: <out_dir>/<stem>.profile.json)")
+    p.add_argument("--profile_dump", choices=["cprofile", "pyinstrument"], default=None,
+                   help="with --profile: also dump a profile per stage into <out_dir>/profile/")
+
+WATCH_BUILD_ONLY = ("profile", "export_matrix")  # one-shot flags --watch has no place for
+
+def parse_args(p, build_only=()) -> argparse.Namespace:
+    """p.parse_args(), refusing --watch together with a build-only flag (plus the
+    script's own `build_only` flags) instead of silently ignoring it."""
+    args = p.parse_args()
+    if args.watch:
+        bad = [f"--{f}" for f in (*WATCH_BUILD_ONLY, *build_only) if getattr(args, f) not in (None, False)]
+        if bad:
+            p.error(f"{', '.join(bad)} cannot be combined with --watch")
+    return args
+
+def start_profile(cfg: DatasetConfig, args):
+    if args.profile is not None:
+        profiling.start(dump=args.profile_dump, dump_dir=Path(args.out_dir) / "profile")
+
+def stop_profile(cfg: DatasetConfig, args, table=None):
+    if args.profile is None:
+        return
+    path = args.profile or Path(args.out_dir) / f"{cfg.stem}.profile.json"
+    fit = fit_config(args)
+    profiling.stop(path, dataset=cfg.name, rows=len(table.df) if table else None,
+                   features=len(table.features) if table else None,
+                   projector=fit["projector"], clusterer=fit["clusterer"], argv=sys.argv[1:])
+
+def rss_report(when: str, table=None):
+    """--lean: current and peak RSS (plus what X and the frame hold, after load)."""
+    mb = lambda b: b / 2**20
+    held = ""
+    if table is not None:
+        held = (f" | X {table.X.dtype} {table.X.shape[0]:,}x{table.X.shape[1]} {mb(table.X.nbytes):.1f} MB, "
+                f"frame {mb(table.df.memory_usage(deep=True).sum()):.1f} MB")
+    print(f"🧠 {when}: RSS {mb(profiling.rss()):.1f} MB, peak {mb(profiling.peak_rss()):.1f} MB{held}")
+
+# ---------------------------
+# Stages
+# ---------------------------
+def load(cfg: DatasetConfig, use_cache=True, chunk_rows=None, lean=False) -> Table:
+    """Read each source (only the columns needed), keep labelled rows, coerce + drop NaN features.
+    With chunk_rows, hand over to load_stream; with lean, see lean_table."""
+    if chunk_rows:
+        return load_stream(cfg, chunk_rows, lean=lean)
+    features = shared_features(cfg)
+    if not features:
+        raise RuntimeError("No shared features between sources after mapping.")
+
+    frames, names = [], [s.name for s in cfg.sources]
+    for src in cfg.sources:
+        with stage("read_csv"):
+            raw = read_table(src.path, list(src.ids) + [src.target] + list(src.features),
+                             dtypes={src.target: "category", **{c: "float64" for c in src.features}},
+                             use_cache=use_cache)
+        with stage("harmonize"):
+            df = harmonize(raw, src, names)
+            frames.append(df[df["label"].notna()])
+
+    with stage("to_numeric"):
+        df = pd.concat(frames, ignore_index=True)
+        before = len(df)
+        df = df.dropna(subset=features).reset_index(drop=True)
+        X = df[features].to_numpy(dtype=np.float32 if lean else float)
+    print(f"Features ({cfg.name}): {features}")
+    print(f"Dropped {before - len(df)} rows with missing values (kept {len(df)})")
+
+    table = Table(df=df, X=X, y=df["label"].astype(int).to_numpy(), features=features)
+    return lean_table(cfg, table) if lean else table
+
+def lean_table(cfg: DatasetConfig, table: Table) -> Table:
+    """--lean: float32 C-contiguous X, and a frame cut down to what point_columns reads
+    (IDs as categoricals, source, label, tooltip columns); the feature frame is released here."""
+    with stage("lean"):
+        tooltip = [c for cands in cfg.attrs.values() for c in cands]
+        table.X = np.ascontiguousarray(table.X, dtype=np.float32)
+        table.df = compact_frame(table.df, cfg.ids, keep=["source", "label", *tooltip], na=cfg.id_na)
+        table.lean = True
+    return table
+
+def shared_features(cfg: DatasetConfig) -> list:
+    """One source: its own feature order; several: the shared (renamed) columns."""
+    feature_sets = [[s.rename.get(c, c) for c in s.features] for s in cfg.sources]
+    return feature_sets[0] if len(feature_sets) == 1 else sorted(set.intersection(*map(set, feature_sets)))
+
+def load_stream(cfg: DatasetConfig, chunk_rows=STREAM_CHUNK_ROWS, lean=False) -> Table:
+    """load() one chunk at a time for catalogs bigger than memory. Each chunk is projected,
+    labelled, coerced and filtered on its own; its features go straight into a float32
+    matrix preallocated from the files' line counts and into StandardScaler.partial_fit.
+    Only the ID/source/label and tooltip columns are kept as a frame."""
+    from sklearn.preprocessing import StandardScaler
+    features = shared_features(cfg)
+    if not features:
+        raise RuntimeError("No shared features between sources after mapping.")
+    tooltip = {c for cands in cfg.attrs.values() for c in cands}
+    names = [s.name for s in cfg.sources]
+
+    # same stage names as load(), one call per chunk, all inside ingest_stream
+    with stage("ingest_stream"):
+        with stage("count_lines"):
+            X = np.empty((sum(count_lines(s.path) for s in cfg.sources), len(features)), dtype=np.float32)
+        scaler, frames, n, labelled = StandardScaler(), [], 0, 0
+        for src in cfg.sources:
+            chunks = iter_table(src.path, list(src.ids) + [src.target] + list(src.features), chunk_rows)
+            while True:
+                with stage("read_csv"):
+                    raw = next(chunks, None)
+                if raw is None:
+                    break
+                with stage("harmonize"):
+                    h = harmonize(raw, src, names)
+                with stage("to_numeric"):
+                    keep = h["label"].notna().to_numpy()
+                    labelled += int(keep.sum())
+                    keep = keep & h[features].notna().all(axis=1).to_numpy()
+                    block = h[features].to_numpy(dtype=np.float32)[keep]
+                if not len(block):
+                    continue
+                if n + len(block) > len(X):  # line count undercounts (XLSX): grow
+                    X.resize((max(2 * len(X), n + len(block)), len(features)), refcheck=False)
+                X[n:n + len(block)] = block
+                with stage("scale_fit"):  # scale() then only applies the fitted scaler
+                    scaler.partial_fit(block)
+                n += len(block)
+
+                cols = [*src.ids, *(c for c in h.columns if c in tooltip and c not in src.ids), "source", "label"]
+                frames.append(h.loc[keep, cols])
+        X.resize((n, len(features)), refcheck=False)
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["source", "label"])
+    print(f"Features ({cfg.name}): {features}")
+    print(f"Dropped {labelled - n} rows with missing values (kept {n}, streamed in chunks of {chunk_rows:,})")
+
+    table = Table(df=df, X=X, y=df["label"].astype(int).to_numpy(), features=features,
+                  scaler=scaler if n else None)
+    return lean_table(cfg, table) if lean else table
+
+def scale(X, scaler=None, copy=True):
+    """Returns (X_scaled, fitted StandardScaler); an already fitted `scaler` is only applied.
+    copy=False scales X in place (float32/float64 X only) and returns it."""
+    from sklearn.preprocessing import StandardScaler
+    with stage("scale"):
+        if scaler is not None:
+            return scaler.transform(X, copy=copy), scaler
+        scaler = StandardScaler(copy=copy)
+        return scaler.fit_transform(X), scaler
+
+def cache_key(cfg: DatasetConfig, table: Table, fit: dict) -> str:
+    with stage("cache_key"):  # hashes the input files
+        if table.lean and table.digest is None:  # X is about to be scaled in place
+            table.digest = matrix_digest(table.X)
+        return fit_key(cfg.paths, table.digest if table.lean else table.X, cfg.cache_base, fit, cfg.k_cap)
+
+def export(cfg: DatasetConfig, table: Table, path) -> Path:
+    """sweep.py hand-off: X/X_scaled plus what it needs to compute cache keys."""
+    return export_matrix(path, table.X, scale(table.X, table.scaler)[0], cfg.paths, cfg.cache_base, cfg.k_cap, artifact_dir(cfg.paths[0]))
+
+def embed(cfg: DatasetConfig, table: Table, fit: dict, n_jobs=-1, use_cache=True,
+          max_bytes=DEFAULT_MAX_BYTES) -> Embedding:
+    """Scale + project to 3D + cluster; deterministic in (inputs, features, fit config), so cached."""
+    key = cache_key(cfg, table, fit)
+    art_dir = artifact_dir(cfg.paths[0])
+    with stage("artifacts"):
+        hit = load_artifacts(art_dir, key) if use_cache else None
+    if hit:
+        arrays, meta = hit
+        print(f"♻️  reused cached embedding {key[:12]} ({meta['projector']} | {meta['clustering']})")
+        return Embedding(arrays["X_scaled"], arrays["coords"], arrays["clabels"],
+                         meta["projector"], meta["clustering"], key=key, cached=True)
+
+    if table.scaled:  # --lean, refit (preview): X was scaled in place by an earlier embed
+        X_scaled, scaler = table.X, table.scaler
+    else:
+        X_scaled, scaler = scale(table.X, table.scaler, copy=not table.lean)
+        if table.lean:  # X_scaled is the same buffer; kept for the next refit
+            table.scaled, table.scaler = True, scaler
+    coords, clabels, projector_used, clustering_used, timings = fit_embedding(X_scaled, fit, cfg.k_cap, n_jobs=n_jobs)
+    print(f"⏱  project {timings['project_s']:.2f}s ({projector_used}) | cluster {timings['cluster_s']:.2f}s ({clustering_used})")
+    if use_cache and "fallback" not in projector_used:
+        with stage("artifacts"):
+            save_artifacts(art_dir, key, {"X_scaled": X_scaled, "coords": coords, "clabels": clabels},
+                           {"projector": projector_used, "clustering": clustering_used}, max_bytes=max_bytes)
+    return Embedding(X_scaled, coords, clabels, projector_used, clustering_used,
+                     key=key, scaler=scaler, timings=timings)
+
+def save_store(cfg: DatasetConfig, table: Table, emb: Embedding, path) -> Path:
+    """--store: the fitted arrays as a store.py directory other processes can map."""
+    with stage("store"):
+        return write_store(path, {"X_scaled": emb.X_scaled, "coords": emb.coords, "clabels": emb.clabels, "y": table.y},
+                           {"dataset": cfg.name, "features": list(table.features), "key": emb.key,
+                            "projector": emb.projector, "clustering": emb.clustering})
+
+def save_neighbors(cfg: DatasetConfig, table: Table, emb: Embedding, out_dir, k=NEIGHBORS_K, n_jobs=-1) -> Path:
+    """--knn: top-k neighbor lists in X_scaled and coords, with the ID/source/label columns to query them."""
+    with stage("neighbors"):
+        df, labs = table.df, pd.Series(table.y)
+        ids = [c for c in cfg.ids if c in df.columns]
+        columns = {c: id_strings(df[c], na=cfg.id_na) for c in ids}
+        columns["source"] = df["source"]
+        columns["label"] = labs.map(cfg.label_names).fillna(labs.astype(str))
+        path = write_neighbors(Path(out_dir) / f"{cfg.stem}.neighbors", {"features": emb.X_scaled, "xyz": emb.coords},
+                               columns, ids=ids, k=k, n_jobs=n_jobs,
+                               meta={"dataset": cfg.name, "features": list(table.features), "projector": emb.projector})
+    size = sum((path / s["file"]).stat().st_size for s in read_meta(path)["arrays"].values())  # not the previous generation
+    print(f"✅ wrote {path.name}/ (k={min(k, len(df) - 1)}, {size:,} bytes)")
+    return path
+
+def point_columns(cfg: DatasetConfig, table: Table, coords, clabels) -> dict:
+    """Ordered {record key: column} in the layout cfg.fields asks for."""
+    with stage("package_points"):
+        df, n = table.df, len(table.df)
+        coords = np.asarray(coords, dtype=float)
+        labs = pd.Series(table.y)
+        cols = {
+            "x": coords[:, 0], "y": coords[:, 1], "z": coords[:, 2],
+            "source": df["source"],
+            "actual_label": labs,
+            "actual_label_name": labs.map(cfg.label_names).fillna(labs.astype(str)),
+            "cluster": np.asarray(clabels).astype(int),
+        }
+        for c in cfg.ids:
+            cols[c] = id_strings(df[c], na=cfg.id_na) if c in df.columns else [cfg.id_na] * n
+        # tooltip attributes, with fallbacks for dataset-specific column names
+        for a, cands in cfg.attrs.items():
+            cols[a] = first_present(df, cands[0], cands[1:]).astype(float)
+        return {k: cols[k] for k in cfg.fields}
+
+def write_points(cfg: DatasetConfig, cols: dict, out_dir, lod="auto") -> Outputs:
+    """<stem>.json (records) + <stem>.bin + .manifest.json (bundle) + <stem>.search.*, or
+    with `lod` "on" (or "auto" and big enough) the manifest, <stem>.lod.json + <stem>.lod/
+    tiles and the search index only; files of the other mode are removed."""
+    stem = Path(out_dir) / cfg.stem
+    out_json = stem.with_name(stem.name + ".json")
+    xyz = np.column_stack([cols["x"], cols["y"], cols["z"]])
+    tree = None
+    if lod == "on" or (lod == "auto" and len(xyz) >= LOD_MIN_ROWS):
+        # the tiled viewer loads neither the records nor the flat bundle
+        for suffix in ("", ".gz", ".br"):
+            out_json.with_name(out_json.name + suffix).unlink(missing_ok=True)
+        out_json = None
+    else:
+        with stage("package_points"):
+            points = package_points(cols)
+        with stage("json_dumps"):
+            out_json.write_text(json.dumps(points), encoding="utf-8")
+    with stage("bundle"):
+        # viewer-space coords (centre + scale computed once, here) and coarse-to-fine row
+        # order (octree breadth-first with --lod); the search index points at the same rows
+        norm = normalization(xyz)
+        if out_json is None:
+            with stage("lod"):
+                tree = build_octree(normalize(xyz, norm))
+        cols = take_rows(cols, tree.order if tree else progressive_order(xyz))
+        out_bin, out_manifest = write_bundle(stem, cols, cfg.label_names, attrs=list(cfg.attrs),
+                                             ids=list(cfg.ids), categories=list(cfg.categories), tree=tree, norm=norm)
+    with stage("search_index"):
+        search_bin, search, shards = write_search_index(stem, cols, ids=list(cfg.ids))
+    return Outputs(out_json, out_bin, out_manifest, search_bin, search, len(xyz),
+                   lod=tree.files(stem) if tree else [], search_shards=shards)
+
+def write_viewer(cfg: DatasetConfig, out_dir) -> Path:
+    out_html = Path(out_dir) / cfg.viewer
+    with stage("html_write"):
+        out_html.write_text(render_template(cfg.template), encoding="utf-8")
+    return out_html
+
+def report(out: Outputs, html: Path, emb: Embedding):
+    if out.bin:
+        print(f"✅ wrote {out.json.name} ({out.count} points)")
+        print(f"✅ wrote {out.bin.name} + {out.manifest.name} ({out.bin.stat().st_size:,} bytes vs {out.json.stat().st_size:,} JSON)")
+    else:
+        print(f"✅ wrote {out.manifest.name} ({out.count} points, in LOD tiles)")
+    print(f"✅ wrote {out.search_bin.name} + {out.search.name} ({out.search_bin.stat().st_size:,} bytes search index, "
+          f"+ {len(out.search_shards)} substring shards {sum(f.stat().st_size for f in out.search_shards):,} bytes on demand)")
+    if out.lod:
+        print(f"✅ wrote {out.lod[0].name} + {len(out.lod) - 2} LOD tiles ({sum(f.stat().st_size for f in out.lod):,} bytes)")
+    print(f"✅ wrote {html.name}")
+    print(f"   projector: {emb.projector} | clustering: {emb.clustering}")
+
+def publish(out: Outputs, html: Path):
+    """Build-time .gz/.br variants of everything the viewer fetches."""
+    with stage("precompress"):
+        files = [f for f in (out.json, out.bin) if f] + [out.manifest, out.search_bin, out.search, html,
+                                                         *out.lod, *out.search_shards]
+        sizes = precompress(html.parent, [str(f.relative_to(html.parent)) for f in files])
+    raw = sum(f.stat().st_size for f in files)
+    best = sum(min([f.stat().st_size, *sizes.get(f.name, {}).values()]) for f in files)
+    print(f"✅ precompressed {', '.join(ENCODERS)}: {raw:,} -> {best:,} bytes on the wire")
+
+# ---------------------------
+# Whole run (what a dataset CLI does by default)
+# ---------------------------
+def embed_args(cfg: DatasetConfig, table: Table, args) -> Embedding:
+    """run()'s embed step: embed() with the CLI's fit and cache flags."""
+    return embed(cfg, table, fit_config(args), n_jobs=args.n_jobs,
+                 use_cache=not args.no_cache, max_bytes=args.cache_max_mb << 20)
+
+def run(cfg: DatasetConfig, args, embed_fn=embed_args):
+    """load -> embed_fn(cfg, table, args) -> outputs -> serve. A script swaps embed_fn to
+    place rows differently (make_tess_embedding.py --transform); --watch always refits."""
+    if args.watch:
+        return preview(cfg, args)
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start_profile(cfg, args)
+    table = load(cfg, use_cache=not args.no_cache, chunk_rows=args.stream, lean=args.lean)
+    if args.lean:
+        rss_report("after load", table)
+    if args.export_matrix:  # sweep.py: one shared matrix for every configuration
+        export(cfg, table, args.export_matrix)
+        sys.exit(0)
+
+    emb = embed_fn(cfg, table, args)
+    if args.lean:
+        rss_report("after embed")
+    if args.store:
+        save_store(cfg, table, emb, args.store)
+    if args.knn:
+        save_neighbors(cfg, table, emb, out_dir, args.knn, n_jobs=args.n_jobs)
+    out = write_points(cfg, point_columns(cfg, table, emb.coords, emb.clabels), out_dir, lod=args.lod)
+    html = write_viewer(cfg, out_dir)
+    report(out, html, emb)
+    if not args.no_precompress:
+        publish(out, html)
+    stop_profile(cfg, args, table)
+    if not args.no_serve:
+        serve(out_dir, cfg.viewer)
+    return table, emb, out
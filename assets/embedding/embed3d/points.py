@@ -0,0 +1,45 @@
+# points.py
+# columnar packaging of the per-point records written to *_tsne3d_points.json
+#
+# Every field is built as a whole column (numpy/pandas), then zipped into
+# records once; the JSON layout is unchanged from the old per-row loop.
+
+import numpy as np
+import pandas as pd
+
+def id_strings(s: pd.Series, na: str = "") -> pd.Series:
+    # str(v) per value, with missing values rendered as `na`
+    return s.astype(str).where(s.notna(), na)
+
+def compact_frame(df: pd.DataFrame, ids, keep=(), na: str = "") -> pd.DataFrame:
+    # --lean: ID columns as categoricals of their final strings (int codes + one copy of
+    # each distinct value) plus the `keep` columns; everything else is dropped
+    out = pd.DataFrame({c: id_strings(df[c], na=na).astype("category") for c in ids if c in df.columns}, index=df.index)
+    for c in keep:
+        if c in df.columns and c not in out.columns:
+            out[c] = df[c]
+    return out
+
+def first_present(df: pd.DataFrame, primary: str, fallbacks=()) -> pd.Series:
+    # df[primary] where set, else the first fallback column that exists
+    out = df[primary] if primary in df.columns else pd.Series(np.nan, index=df.index)
+    for c in fallbacks:
+        if c in df.columns:
+            return out.where(out.notna(), df[c])
+    return out
+
+def _as_list(col) -> list:
+    if isinstance(col, (pd.Series, pd.Index)):
+        col = col.to_numpy()
+    if isinstance(col, np.ndarray):
+        return col.tolist()  # native int/float/str, same repr as int()/float()/str()
+    return list(col)
+
+def package_points(columns: dict) -> list:
+    # columns: ordered {json key: column}; key order is the record key order
+    keys = list(columns)
+    cols = [_as_list(v) for v in columns.values()]
+    n = len(cols[0]) if cols else 0
+    if any(len(c) != n for c in cols):
+        raise ValueError("package_points: columns differ in length")
+    return [dict(zip(keys, row)) for row in zip(*cols)]
@@ -0,0 +1,273 @@
+# preview.py
+# live-rebuild preview server (--watch): asyncio HTTP + server-sent events
+#
+#   watch    poll the dataset files, the --config JSON and the viewer template
+#   rebuild  in a long-lived worker process that keeps the loaded table and the last
+#            embedding between runs, so only the stages downstream of a change rerun:
+#              data file   -> load -> embed -> points
+#              --config    ->         embed -> points
+#              template    ->                  viewer
+#            (embed still goes through the artifact cache, so reverting a change is free)
+#   push     "bundle" on /__events: open viewers swap the new arrays into their buffers
+#            in place (onBundleUpdate in viewer.py); "reload" when the page itself changed
+#
+# Static files are served like serve.py (precompressed variants, strong ETags, 304);
+# the viewer HTML gets the small EventSource client appended on the way out, so the
+# files on disk stay exactly what a plain build writes.
+
+import asyncio, json, mimetypes, time, traceback, webbrowser
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from .datasets import DatasetConfig
+from .fit import fit_config
+from .viewer import TEMPLATE_DIR
+from .serve import PORT, ENCODERS, HASHED_NAME, IMMUTABLE, REVALIDATE, strong_etag, accepted_encodings
+
+POLL_S = 0.5        # file watcher interval
+SETTLE_S = 0.3      # wait this long after a change so half-written files are not read
+PING_S = 15         # SSE keep-alive comment
+EVENTS = "/__events"
+TYPES = {".json": "application/json", ".bin": "application/octet-stream", ".js": "text/javascript",
+         ".html": "text/html; charset=utf-8"}
+
+CLIENT_JS = """<script>
+// embed3d live preview (added by the preview server, not part of the written file)
+(() => {
+  const es = new EventSource("%s");
+  let seen = null;
+  const refresh = () => window.embed3dRefresh ? window.embed3dRefresh().catch(err => console.warn(err)) : location.reload();
+  es.addEventListener("hello", e => { const v = JSON.parse(e.data).version; if (seen !== null && v !== seen) refresh(); seen = v; });
+  es.addEventListener("bundle", e => { seen = JSON.parse(e.data).version; refresh(); });
+  es.addEventListener("reload", () => location.reload());
+  es.addEventListener("failed", e => console.warn("embed3d rebuild failed:", JSON.parse(e.data).error));
+})();
+</script>
+""" % EVENTS
+
+# ---------------------------
+# Worker process: pipeline stages with state kept between rebuilds
+# ---------------------------
+_STATE = {}
+
+def _signature(paths):
+    sig = []
+    for p in paths:
+        try:
+            st = Path(p).stat()
+            sig.append((str(p), st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append((str(p), None, None))
+    return sig
+
+def _rebuild(cfg: DatasetConfig, fit: dict, n_jobs: int, out_dir: str, use_cache: bool, max_bytes: int,
+             compress: bool, lod: str, stream: int, lean: bool, knn: int = None, store: str = None) -> dict:
+    """Rerun whatever is stale; returns {"stages": [...], ...}. Runs in the worker."""
+    from .pipeline import load, embed, point_columns, write_points, write_viewer, publish, save_store, save_neighbors
+    t0, ran, out_dir = time.perf_counter(), [], Path(out_dir)
+
+    data = _signature(cfg.paths)
+    if _STATE.get("data") != data:
+        _STATE.update(table=load(cfg, use_cache=use_cache, chunk_rows=stream, lean=lean), data=data, fit=None)
+        ran.append("load")
+    if _STATE.get("fit") != fit:
+        _STATE.update(emb=embed(cfg, _STATE["table"], fit, n_jobs=n_jobs, use_cache=use_cache, max_bytes=max_bytes),
+                      fit=fit, out=None)
+        ran.append("embed")
+        if store:
+            save_store(cfg, _STATE["table"], _STATE["emb"], store)
+            ran.append("store")
+        if knn:
+            save_neighbors(cfg, _STATE["table"], _STATE["emb"], out_dir, knn, n_jobs=n_jobs)
+            ran.append("neighbors")
+    if _STATE.get("out") is None:
+        emb = _STATE["emb"]
+        _STATE["out"] = write_points(cfg, point_columns(cfg, _STATE["table"], emb.coords, emb.clabels), out_dir, lod=lod)
+        ran.append("points")
+    template = _signature([TEMPLATE_DIR / cfg.template])
+    if _STATE.get("template") != template or not (out_dir / cfg.viewer).exists():
+        write_viewer(cfg, out_dir)
+        _STATE["template"] = template
+        ran.append("viewer")
+    if ran and compress:
+        publish(_STATE["out"], out_dir / cfg.viewer)
+
+    out, emb = _STATE["out"], _STATE["emb"]
+    return {"stages": ran, "manifest": out.manifest.name, "bin": out.bin.name if out.bin else None, "count": out.count,
+            "projector": emb.projector, "clustering": emb.clustering,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+# ---------------------------
+# Server
+# ---------------------------
+class Preview:
+    def __init__(self, cfg: DatasetConfig, args, port=PORT, host="127.0.0.1"):
+        self.cfg, self.args, self.port, self.host = cfg, args, port, host
+        self.out_dir = Path(args.out_dir).resolve()
+        self.config = Path(args.config) if args.config else None
+        self.clients = set()     # one asyncio.Queue per open /__events stream
+        self.version = 0
+        self.pool = ProcessPoolExecutor(max_workers=1)
+
+    # -- what to watch / how to fit --------------------------------------------
+    def watched(self):
+        return [*self.cfg.paths, *([self.config] if self.config else []), TEMPLATE_DIR / self.cfg.template]
+
+    def fit(self) -> dict:
+        """CLI fit flags, overridden by the --config JSON (re-read on every rebuild)."""
+        fit = fit_config(self.args)
+        if self.config and self.config.exists():
+            over = json.loads(self.config.read_text(encoding="utf-8"))
+            unknown = sorted(set(over) - set(fit))
+            if unknown:
+                print(f"⚠️  {self.config.name}: ignoring unknown keys {unknown}")
+            fit.update({k: v for k, v in over.items() if k in fit})
+            fit["projector"] = str(fit["projector"]).lower()
+        return fit
+
+    # -- rebuild + push --------------------------------------------------------
+    async def rebuild(self):
+        loop = asyncio.get_running_loop()
+        try:
+            res = await loop.run_in_executor(
+                self.pool, _rebuild, self.cfg, self.fit(), self.args.n_jobs, str(self.out_dir),
+                not self.args.no_cache, self.args.cache_max_mb << 20, not self.args.no_precompress, self.args.lod,
+                self.args.stream, self.args.lean, self.args.knn, self.args.store)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):  # worker died (e.g. OOM): next rebuild starts clean
+                self.pool = ProcessPoolExecutor(max_workers=1)
+            traceback.print_exception(e)
+            self.broadcast("failed", {"error": f"{type(e).__name__}: {e}"})
+            return
+        if not res["stages"]:
+            return
+        self.version += 1
+        print(f"🔁 v{self.version}: {' -> '.join(res['stages'])} in {res['seconds']:.2f}s "
+              f"({res['count']} points | {res['projector']} | {res['clustering']}) -> {len(self.clients)} viewer(s)")
+        self.broadcast("reload" if "viewer" in res["stages"] else "bundle", {**res, "version": self.version})
+
+    def broadcast(self, event: str, data: dict):
+        msg = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+        for q in self.clients:
+            q.put_nowait(msg)
+
+    async def watch(self):
+        last = _signature(self.watched())
+        while True:
+            await asyncio.sleep(POLL_S)
+            if _signature(self.watched()) == last:
+                continue
+            await asyncio.sleep(SETTLE_S)
+            last = _signature(self.watched())
+            await self.rebuild()
+
+    # -- HTTP ------------------------------------------------------------------
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = (lines[0].split(" ") + ["", ""])[:3]
+            headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+            path = unquote(urlsplit(target).path)
+            if method not in ("GET", "HEAD"):
+                self.reply(writer, 405, {"Allow": "GET, HEAD"})
+            elif path == EVENTS:
+                return await self.events(writer)
+            else:
+                self.static(writer, path, headers, body=method == "GET")
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def events(self, writer):
+        q = asyncio.Queue()
+        self.clients.add(q)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Connection: keep-alive\r\n\r\nretry: 1000\n\n")
+            writer.write(f"event: hello\ndata: {json.dumps({'version': self.version})}\n\n".encode())
+            await writer.drain()
+            while True:
+                try:
+                    msg = await asyncio.wait_for(q.get(), PING_S)
+                except asyncio.TimeoutError:
+                    msg = b": ping\n\n"
+                writer.write(msg)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(q)
+            writer.close()
+
+    def static(self, writer, path, headers, body=True):
+        if path == "/":
+            return self.reply(writer, 302, {"Location": f"/{self.cfg.viewer}"})
+        f = (self.out_dir / path.lstrip("/")).resolve()
+        if self.out_dir not in f.parents or not f.is_file():
+            return self.reply(writer, 404, {"Content-Type": "text/plain"}, b"not found\n", body)
+        st = f.stat()
+        ctype = TYPES.get(f.suffix) or mimetypes.guess_type(f.name)[0] or "application/octet-stream"
+        common = {"Content-Type": ctype, "Last-Modified": formatdate(st.st_mtime, usegmt=True)}
+
+        if f.suffix == ".html":  # page: always fresh, live client appended
+            page = f.read_bytes()
+            at = page.rfind(b"</body>")
+            page = page[:at] + CLIENT_JS.encode() + page[at:] if at >= 0 else page + CLIENT_JS.encode()
+            return self.reply(writer, 200, {**common, "Cache-Control": "no-store"}, page, body)
+
+        rep, rep_st, encoding = f, st, None
+        accepted = accepted_encodings(headers.get("accept-encoding"))
+        for enc in ("br", "gzip"):
+            cand = f.with_name(f.name + ENCODERS[enc][0]) if enc in ENCODERS else None
+            if enc in accepted and cand and cand.is_file() and cand.stat().st_mtime_ns >= st.st_mtime_ns:
+                rep, rep_st, encoding = cand, cand.stat(), enc
+                break
+        etag = strong_etag(str(rep), rep_st)
+        hdrs = {**common, "ETag": etag, "Vary": "Accept-Encoding",
+                "Cache-Control": IMMUTABLE if HASHED_NAME.search(f.name) else REVALIDATE}
+        if encoding:
+            hdrs["Content-Encoding"] = encoding
+        inm = headers.get("if-none-match")
+        if inm and (inm == "*" or etag in [t.strip() for t in inm.split(",")]):
+            return self.reply(writer, 304, {k: v for k, v in hdrs.items() if k != "Content-Type"})
+        self.reply(writer, 200, hdrs, rep.read_bytes(), body)
+
+    @staticmethod
+    def reply(writer, status, headers, payload=b"", body=True):
+        reason = {200: "OK", 302: "Found", 304: "Not Modified", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        # a 304 has no body by definition: no Content-Length (as in serve.py)
+        headers = {**headers, **({} if status == 304 else {"Content-Length": str(len(payload))}), "Connection": "close"}
+        writer.write(f"HTTP/1.1 {status} {reason}\r\n".encode()
+                     + "".join(f"{k}: {v}\r\n" for k, v in headers.items()).encode() + b"\r\n")
+        if body and payload:
+            writer.write(payload)
+
+    # -- main ------------------------------------------------------------------
+    async def main(self, open_browser=True):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        await self.rebuild()
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        url = f"http://{self.host}:{self.port}/{self.cfg.viewer}"
+        names = ", ".join(Path(p).name for p in self.watched())
+        print(f"👀 Live preview on {url}  (watching {names}; Ctrl+C to stop)")
+        if open_browser:
+            webbrowser.open(url)
+        async with server:
+            await self.watch()
+
+def preview(cfg: DatasetConfig, args, port=PORT, open_browser=True):
+    """Build, serve out_dir and rebuild + push on every change (foreground, Ctrl+C to stop)."""
+    p = Preview(cfg, args, port=port)
+    try:
+        asyncio.run(p.main(open_browser=open_browser))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        p.pool.shutdown(cancel_futures=True)
+        print("👋 Preview stopped")
@@ -0,0 +1,198 @@
+# profiling.py
+# per-stage wall time, CPU time and peak RSS (--profile)
+#
+# Code marks its stages with `with stage("name"):`; that is a no-op unless a Profiler
+# is active, so the pipeline modules stay free of profiling plumbing. Repeated stages
+# (e.g. read_csv once per source) accumulate. Stages may nest (lod inside bundle); a
+# nested stage's time is also part of its parent's, so only outermost stages add up
+# to the staged total. RSS is sampled on a background thread,
+# so a stage's peak includes transient allocations that are freed before it ends.
+# With dump="cprofile" (or "pyinstrument", if installed) each outermost stage is also
+# written to <dump_dir>/<stage>.prof / .html.
+
+import json, os, sys, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+_ACTIVE = None
+SAMPLE_S = 0.005
+
+# ---------------------------
+# Resident set size
+# ---------------------------
+def _rss_reader():
+    try:
+        import psutil
+        proc = psutil.Process()
+        return lambda: proc.memory_info().rss
+    except ImportError:
+        pass
+    if os.path.exists("/proc/self/statm"):
+        page = os.sysconf("SC_PAGE_SIZE")
+        def statm():
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * page
+        return statm
+    return peak_rss  # no current-RSS source: the process high-water mark is the best we have
+
+def peak_rss() -> int:
+    """Process high-water RSS in bytes."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+rss = _rss_reader()
+
+# ---------------------------
+# Profiler
+# ---------------------------
+class Profiler:
+    def __init__(self, dump=None, dump_dir=None):
+        self.dump, self.dump_dir = dump, Path(dump_dir) if dump_dir else None
+        self.stages = {}      # name -> {"calls", "wall_s", "cpu_s", "peak_rss", "rss_delta", "depth"}
+        self.outer_wall_s = 0.0  # wall time of outermost stages only
+        self._open = []       # [name, peak] of stages currently running
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._t0 = time.perf_counter()
+        if self.dump == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                print("⚠️  pyinstrument not installed; dumping cProfile stats instead")
+                self.dump = "cprofile"
+        if self.dump and self.dump_dir:
+            self.dump_dir.mkdir(parents=True, exist_ok=True)
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_S):
+            r = rss()
+            with self._lock:
+                for s in self._open:
+                    s[1] = max(s[1], r)
+
+    @contextmanager
+    def stage(self, name):
+        depth = len(self._open)
+        outermost = not depth
+        # registered on entry, so a parent is listed before the stages nested in it
+        s = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss": 0, "rss_delta": 0,
+                                          "depth": depth})
+        r0 = rss()
+        entry = [name, r0]
+        with self._lock:
+            self._open.append(entry)
+        prof = self._start_dump() if outermost else None
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+            r1 = rss()
+            if prof is not None:
+                self._end_dump(prof, name)
+            with self._lock:
+                self._open.remove(entry)
+                peak = max(entry[1], r1)
+            s["depth"] = min(s["depth"], depth)
+            if outermost:
+                self.outer_wall_s += wall
+            s["calls"] += 1
+            s["wall_s"] += wall
+            s["cpu_s"] += cpu
+            s["peak_rss"] = max(s["peak_rss"], peak)
+            s["rss_delta"] += r1 - r0
+
+    def _start_dump(self):
+        if self.dump == "cprofile":
+            import cProfile
+            prof = cProfile.Profile()
+        elif self.dump == "pyinstrument":
+            import pyinstrument
+            prof = pyinstrument.Profiler()
+        else:
+            return None
+        prof.enable() if self.dump == "cprofile" else prof.start()
+        return prof
+
+    def _end_dump(self, prof, name):
+        calls = self.stages.get(name, {}).get("calls", 0)
+        stem = name if not calls else f"{name}.{calls + 1}"
+        if self.dump == "cprofile":
+            prof.disable()
+            prof.dump_stats(self.dump_dir / f"{stem}.prof")
+        else:
+            prof.stop()
+            (self.dump_dir / f"{stem}.html").write_text(prof.output_html(), encoding="utf-8")
+
+    def close(self):
+        self._stop.set()
+        self._sampler.join()
+
+    # ---------------------------
+    # Report
+    # ---------------------------
+    def summary(self, **meta) -> dict:
+        mb = lambda b: round(b / 2**20, 1)
+        return {
+            **meta,
+            "total_wall_s": round(time.perf_counter() - self._t0, 3),
+            "staged_wall_s": round(self.outer_wall_s, 3),
+            "peak_rss_mb": mb(peak_rss()),
+            "stages": [{"stage": k, "depth": v["depth"], "calls": v["calls"], "wall_s": round(v["wall_s"], 4),
+                        "cpu_s": round(v["cpu_s"], 4), "peak_rss_mb": mb(v["peak_rss"]), "rss_delta_mb": mb(v["rss_delta"])}
+                       for k, v in self.stages.items()],
+        }
+
+    @staticmethod
+    def table(summary: dict) -> str:
+        # nested stages indented under their parent's name; their time is not added again
+        rows = [f"{'stage':<20}{'calls':>6}{'wall s':>10}{'cpu s':>10}{'peak RSS MB':>13}{'ΔRSS MB':>10}"]
+        for s in summary["stages"]:
+            name = "  " * s.get("depth", 0) + s["stage"]
+            rows.append(f"{name:<20}{s['calls']:>6}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}"
+                        f"{s['peak_rss_mb']:>13.1f}{s['rss_delta_mb']:>+10.1f}")
+        staged = summary.get("staged_wall_s", sum(s["wall_s"] for s in summary["stages"] if not s.get("depth", 0)))
+        rows.append(f"{'total':<20}{'':>6}{summary['total_wall_s']:>10.3f}{'':>10}{summary['peak_rss_mb']:>13.1f}"
+                    f"   ({summary['total_wall_s'] - staged:.3f}s outside stages)")
+        return "\n".join(rows)
+
+    def write(self, path, **meta) -> dict:
+        summary = self.summary(**meta)
+        Path(path).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return summary
+
+# ---------------------------
+# Module-level hooks
+# ---------------------------
+@contextmanager
+def stage(name):
+    """Time a block under `name` if a Profiler is active."""
+    if _ACTIVE is None:
+        yield
+        return
+    with _ACTIVE.stage(name):
+        yield
+
+def start(dump=None, dump_dir=None) -> Profiler:
+    global _ACTIVE
+    _ACTIVE = Profiler(dump=dump, dump_dir=dump_dir)
+    return _ACTIVE
+
+def stop(path=None, **meta) -> dict:
+    """Deactivate, print the table, write the JSON report to `path` (if given)."""
+    global _ACTIVE
+    prof, _ACTIVE = _ACTIVE, None
+    if prof is None:
+        return {}
+    prof.close()
+    summary = prof.write(path, **meta) if path else prof.summary(**meta)
+    print(Profiler.table(summary))
+    if path:
+        print(f"✅ wrote {Path(path).name}")
+    return summary
@@ -0,0 +1,125 @@
+# projectors.py
+# 3D projector registry: tsne (pluggable backends) / umap / pca
+#
+# A backend raises ImportError when its library is missing; only then does
+# project() fall back (next backend for "auto", PCA otherwise). Any other
+# error is a real failure and propagates.
+
+import inspect, os
+import numpy as np
+
+PROJECTORS = {}      # name -> fn(X, seed, n_jobs, n_components, **params) -> coords
+TSNE_BACKENDS = {}   # name -> fn(X, perplexity, seed, n_jobs, n_components) -> coords
+TSNE_AUTO_ORDER = ["opentsne", "multicore", "sklearn"]
+TSNE_ITERS = 1000
+
+def register_projector(name):
+    def deco(fn):
+        PROJECTORS[name] = fn
+        return fn
+    return deco
+
+def register_tsne_backend(name):
+    def deco(fn):
+        TSNE_BACKENDS[name] = fn
+        return fn
+    return deco
+
+def _cpu_jobs(n_jobs: int) -> int:
+    return (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else max(1, n_jobs)
+
+def default_perplexity(n: int) -> float:
+    return min(30, max(5, n // 50))
+
+# ---------------------------
+# t-SNE backends
+# ---------------------------
+@register_tsne_backend("sklearn")
+def _tsne_sklearn(X, perplexity, seed, n_jobs, n_components):
+    from sklearn.manifold import TSNE
+    # n_iter was renamed max_iter in scikit-learn 1.5 and removed in 1.7
+    iters = "max_iter" if "max_iter" in inspect.signature(TSNE).parameters else "n_iter"
+    tsne = TSNE(
+        n_components=n_components, learning_rate="auto", init="pca", method="barnes_hut",
+        perplexity=perplexity, random_state=seed, n_jobs=n_jobs, **{iters: TSNE_ITERS},
+    )
+    return tsne.fit_transform(X)
+
+@register_tsne_backend("opentsne")
+def _tsne_opentsne(X, perplexity, seed, n_jobs, n_components):
+    import openTSNE
+    # FFT interpolation only exists for 1-2 components; 3D uses openTSNE's multithreaded Barnes-Hut
+    tsne = openTSNE.TSNE(
+        n_components=n_components, perplexity=perplexity, n_iter=TSNE_ITERS,
+        initialization="pca", learning_rate="auto",
+        negative_gradient_method="fft" if n_components <= 2 else "bh",
+        n_jobs=n_jobs, random_state=seed,
+    )
+    return np.asarray(tsne.fit(np.ascontiguousarray(X, dtype=float)))
+
+@register_tsne_backend("multicore")
+def _tsne_multicore(X, perplexity, seed, n_jobs, n_components):
+    from MulticoreTSNE import MulticoreTSNE
+    tsne = MulticoreTSNE(
+        n_components=n_components, perplexity=perplexity, n_iter=TSNE_ITERS,
+        n_jobs=_cpu_jobs(n_jobs), random_state=seed,
+    )
+    return tsne.fit_transform(np.ascontiguousarray(X, dtype=float))
+
+# ---------------------------
+# Projectors
+# ---------------------------
+@register_projector("pca")
+def _pca(X, seed, n_jobs, n_components, **params):
+    from sklearn.decomposition import PCA
+    return PCA(n_components=n_components, random_state=seed).fit_transform(X)
+
+@register_projector("umap")
+def _umap(X, seed, n_jobs, n_components, n_neighbors=15, min_dist=0.1, **params):
+    import umap
+    return umap.UMAP(
+        n_components=n_components, n_neighbors=n_neighbors, min_dist=min_dist, random_state=seed,
+    ).fit_transform(X)
+
+def available_tsne_backends() -> list:
+    out = []
+    for name, mod in (("opentsne", "openTSNE"), ("multicore", "MulticoreTSNE"), ("sklearn", "sklearn")):
+        try:
+            __import__(mod)
+            out.append(name)
+        except ImportError:
+            pass
+    return out
+
+def resolve_tsne_backend(backend="auto") -> str:
+    """Backend name "auto" would pick (for cache keys); explicit names pass through."""
+    if backend != "auto":
+        return backend
+    avail = available_tsne_backends()
+    return avail[0] if avail else "none"
+
+def run_tsne(X, backend="auto", seed=42, n_jobs=-1, n_components=3, perplexity=None):
+    """Returns (coords, backend name); ImportError if no requested backend is installed."""
+    perplexity = default_perplexity(len(X)) if perplexity is None else perplexity
+    names = TSNE_AUTO_ORDER if backend == "auto" else [backend]
+    missing = []
+    for name in names:
+        if name not in TSNE_BACKENDS:
+            raise ValueError(f"unknown t-SNE backend {name!r} (have: {', '.join(TSNE_BACKENDS)})")
+        try:
+            return TSNE_BACKENDS[name](X, perplexity, seed, n_jobs, n_components), name
+        except ImportError as e:
+            missing.append(f"{name}: {e}")
+    raise ImportError("; ".join(missing))
+
+def project(X, method="tsne", tsne_backend="auto", seed=42, n_jobs=-1, n_components=3, perplexity=None, **params):
+    """Returns (coords, human-readable projector label); params go to the projector (umap: n_neighbors, min_dist)."""
+    try:
+        if method == "tsne":
+            coords, used = run_tsne(X, tsne_backend, seed, n_jobs, n_components, perplexity)
+            return coords, f"t-SNE ({used})"
+        coords = PROJECTORS[method](X, seed, n_jobs, n_components, **params)
+        return coords, {"umap": "UMAP", "pca": "PCA"}.get(method, method)
+    except ImportError as e:
+        print(f"⚠️  {method} unavailable ({e}); falling back to PCA")
+        return PROJECTORS["pca"](X, seed, n_jobs, n_components), "PCA (fallback)"
@@ -0,0 +1,139 @@
+# search.py
+# prebuilt identifier lookup for the viewer: <stem>.search.<hash>.bin + <stem>.search.json,
+# plus trigram posting shards in <stem>.search/
+#
+# Every non-empty ID value (kepid, kepler_name, toi, ...) is normalized (lowercase,
+# collapsed whitespace, float-rendered integers like "10797460.0" cut to "10797460") into a key. Keys are stored sorted, so exact and prefix queries
+# are a binary search; substring queries of 3+ chars scan the posting list of the
+# query's rarest trigram and check each candidate key. Layout of the .bin:
+#   keys      uint8  [..]   sorted keys, utf-8, each NUL-terminated
+#   post_off  uint16/uint32 [K+1]  key k -> rows post_row[post_off[k]:post_off[k+1]]
+#   post_row  uint16/uint32 matching row
+#   post_col  uint8         index into manifest["ids"] of the column that matched
+#   tri_code  uint32 [G]    sorted distinct byte trigrams (b0<<16 | b1<<8 | b2)
+#   tri_off   uint32 [G+1]  trigram t -> its key ids at tri_off[t]..tri_off[t+1] of the postings
+# The postings themselves (tri_key, ascending key ids per trigram) are the bulk of the
+# index and are only needed for substring queries, so they are cut into ~SHARD_BYTES
+# shards of whole trigrams, <stem>.search/tri<N>.<sha12>.bin, which the viewer fetches
+# one at a time on demand (manifest "shards": first trigram + file of each).
+#
+# The build is vectorized: keys are one sorted factorize over all ID columns, postings a
+# stable argsort, and trigrams come from sliding over the NUL-separated key blob.
+
+import json, re
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .bundle import _Writer, _col, _index_dtype, write_content_addressed
+
+SEARCH_VERSION = 2
+SHARD_BYTES = 256 << 10   # trigram postings per lazily fetched shard
+MISSING = {"", "nan", "none", "null"}
+
+CATALOG_PREFIX = re.compile(r"^(toi|tic|tid|kic)[-\s]*(?=\d)")
+FLOAT_INT = re.compile(r"^(\d+)\.0$")   # an integer ID read through a float column
+
+def int_id(v: str) -> str:
+    """ "10797460.0" -> "10797460"; anything else unchanged."""
+    return FLOAT_INT.sub(r"\1", v)
+
+def normalize_key(s: str) -> str:
+    return " ".join(str(s).lower().split())
+
+def normalize_query(q: str) -> str:
+    """A typed query the way the viewer's norm() (SEARCH_JS) reads it: IDs are stored
+    bare, so a TOI-/TIC/TID/KIC catalog prefix is dropped, and as keys (int_id).
+
+    >>> normalize_query("TOI-700.01"), normalize_query(" tic  259353953"), normalize_query("Kepler-227 b")
+    ('700.01', '259353953', 'kepler-227 b')
+    >>> normalize_query("KIC 10797460.0")
+    '10797460'
+    """
+    return int_id(CATALOG_PREFIX.sub("", normalize_key(q)))
+
+def _postings(columns: dict, ids):
+    """(sorted unique keys, post_row, post_col, post_off) over the ID columns, rows of a
+    key in column then row order."""
+    keys, rows, cols = [], [], []
+    for j, c in enumerate(ids):
+        k = pd.Series(_col(columns[c])).astype(str).str.lower().str.split().str.join(" ").str.replace(FLOAT_INT, r"\1", regex=True)
+        if k.str.contains("\0", regex=False).any():
+            raise ValueError("ID strings may not contain NUL")
+        ok = ~k.isin(MISSING).to_numpy()
+        keys.append(k.to_numpy()[ok])
+        rows.append(np.flatnonzero(ok))
+        cols.append(np.full(int(ok.sum()), j))
+    inv, uniq = pd.factorize(np.concatenate(keys) if keys else np.empty(0, dtype=object), sort=True)
+    order = np.argsort(inv, kind="stable")
+    off = np.zeros(len(uniq) + 1, dtype=np.int64)
+    off[1:] = np.cumsum(np.bincount(inv, minlength=len(uniq)))
+    return uniq, np.concatenate(rows)[order], np.concatenate(cols)[order], off
+
+def _trigrams(blob: np.ndarray, n_keys: int):
+    """(tri_code, tri_off, tri_key) from the NUL-terminated key blob."""
+    b = blob.astype(np.uint32)
+    grams = (b[:-2] << 16) | (b[1:-1] << 8) | b[2:]
+    inside = (blob[:-2] != 0) & (blob[1:-1] != 0) & (blob[2:] != 0)
+    key_of = np.cumsum(blob == 0) - (blob == 0)  # key id of every blob byte
+    pairs = np.sort((grams[inside].astype(np.uint64) << np.uint64(32)) | key_of[:-2][inside].astype(np.uint64))
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs  # a trigram once per key
+    code = (pairs >> np.uint64(32)).astype("<u4")
+    first = np.flatnonzero(np.r_[True, code[1:] != code[:-1]]) if len(code) else np.empty(0, dtype=np.int64)
+    codes = code[first]
+    off = np.append(first, len(code)).astype("<u4")
+    return codes, off, (pairs & np.uint64(0xFFFFFFFF)).astype(_index_dtype(n_keys))
+
+def _shards(tri_off: np.ndarray, itemsize: int) -> list:
+    """Trigram ranges [first, end) of about SHARD_BYTES of postings each (a bigger list gets its own)."""
+    step = max(1, SHARD_BYTES // itemsize)
+    cuts = np.unique(np.searchsorted(tri_off, np.arange(step, int(tri_off[-1]), step)))
+    bounds = [0, *(int(c) for c in cuts if 0 < c < len(tri_off) - 1), len(tri_off) - 1]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+def write_search_index(stem, columns: dict, ids):
+    """Write <stem>.search.<hash>.bin + <stem>.search.json + <stem>.search/ shards over the
+    given ID columns; returns (bin, manifest, shard files)."""
+    stem = Path(stem)
+    manifest_path = stem.with_name(stem.name + ".search.json")
+
+    ids = list(ids)
+    uniq, post_row, post_col, off = _postings(columns, ids)
+    blob = np.frombuffer("".join(k + "\0" for k in uniq.tolist()).encode("utf-8"), dtype=np.uint8)
+    n = len(_col(columns[ids[0]])) if ids else 0
+    w = _Writer()
+    arrays = {}
+    arrays["keys"] = w.add(blob)
+    arrays["post_off"] = w.add(off.astype(_index_dtype(int(off[-1]))))
+    arrays["post_row"] = w.add(post_row.astype(_index_dtype(n)))
+    arrays["post_col"] = w.add(post_col.astype("<u1"))
+    codes, toff, tkeys = _trigrams(blob, len(uniq))
+    arrays["tri_code"] = w.add(codes)
+    arrays["tri_off"] = w.add(toff)
+
+    shard_dir = stem.with_name(stem.name + ".search")
+    shard_dir.mkdir(exist_ok=True)
+    shards, written = [], set()
+    for s, (a, b) in enumerate(_shards(toff, tkeys.itemsize)):
+        path = write_content_addressed(shard_dir / f"tri{s}", tkeys[toff[a]:toff[b]].tobytes())
+        written.add(path.name)
+        shards.append({"first": a, "file": f"{shard_dir.name}/{path.name}"})
+    for f in shard_dir.iterdir():  # shards of an earlier build
+        if f.name.removesuffix(".gz").removesuffix(".br") not in written:
+            f.unlink()
+
+    manifest = {
+        "format": "embed3d-search",
+        "version": SEARCH_VERSION,
+        "bin": None,
+        "bytes": w.size,
+        "ids": ids,
+        "keys": len(uniq),
+        "arrays": arrays,
+        "tri_key": {"dtype": tkeys.dtype.name, "length": int(tkeys.size)},
+        "shards": shards,
+    }
+    bin_path = write_content_addressed(stem.with_name(stem.name + ".search"), b"".join(w.blocks))
+    manifest["bin"] = bin_path.name
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return bin_path, manifest_path, sorted(shard_dir.glob("*.bin"))
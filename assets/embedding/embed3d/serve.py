@@ -0,0 +1,207 @@
+# serve.py
+# static serving of a viewer out_dir: precompressed variants, strong ETags, cache
+# headers and byte ranges on top of the stdlib ThreadingHTTPServer
+#
+#   precompress(out_dir)   build time: <file>.gz (+ <file>.br if brotli is installed)
+#                          next to every .json/.html/.bin/.js that shrinks
+#   serve(out_dir, page)   picks br > gzip > identity per Accept-Encoding
+#
+# Content-addressed names (<name>.<12+ hex>.<ext>, see bundle.write_content_addressed)
+# are sent `immutable` for a year; everything else is `no-cache`, i.e. revalidated with
+# If-None-Match and answered 304 when unchanged.
+
+import gzip, hashlib, os, re, threading, webbrowser
+from email.utils import formatdate
+from functools import partial
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+PORT = 8008
+COMPRESS_EXTS = (".json", ".html", ".bin", ".js", ".css", ".svg")
+MIN_SAVING = 0.05          # keep a compressed variant only if it is >= 5% smaller
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12,}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+ENCODERS = {"gzip": (".gz", lambda b: gzip.compress(b, compresslevel=6, mtime=0))}
+if brotli is not None:
+    ENCODERS["br"] = (".br", lambda b: brotli.compress(b, quality=9))
+
+# ---------------------------
+# Build time
+# ---------------------------
+def precompress(out_dir, names=None, exts=COMPRESS_EXTS) -> dict:
+    """Write .gz/.br siblings; returns {file name: {encoding: bytes}}. Up-to-date ones are skipped."""
+    out_dir = Path(out_dir)
+    files = [out_dir / n for n in names] if names else [f for f in out_dir.iterdir() if f.is_file()]
+    sizes = {}
+    for f in files:
+        if f.suffix not in exts or not f.is_file():
+            continue
+        data, mtime = None, f.stat().st_mtime_ns
+        for enc, (suffix, compress) in ENCODERS.items():
+            dst = f.with_name(f.name + suffix)
+            if dst.exists() and dst.stat().st_mtime_ns >= mtime:
+                sizes.setdefault(f.name, {})[enc] = dst.stat().st_size
+                continue
+            data = f.read_bytes() if data is None else data
+            packed = compress(data)
+            if len(packed) > (1 - MIN_SAVING) * len(data):
+                dst.unlink(missing_ok=True)
+                continue
+            tmp = dst.with_name(dst.name + ".tmp")
+            tmp.write_bytes(packed)
+            tmp.replace(dst)
+            sizes.setdefault(f.name, {})[enc] = len(packed)
+    return sizes
+
+# ---------------------------
+# Request handling
+# ---------------------------
+_etags, _etag_lock = {}, threading.Lock()
+
+def strong_etag(path: str, st) -> str:
+    """sha256 of the content, memoized on (path, size, mtime)."""
+    key = (path, st.st_size, st.st_mtime_ns)
+    with _etag_lock:
+        tag = _etags.get(key)
+    if tag is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        tag = f'"{h.hexdigest()[:32]}"'
+        with _etag_lock:
+            _etags[key] = tag
+    return tag
+
+def accepted_encodings(header: str) -> set:
+    out = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            out.add(name.strip().lower())
+    return out
+
+def parse_range(header: str, size: int):
+    """(start, end) inclusive for a single `bytes=` range, None to ignore, or 'unsatisfiable'."""
+    m = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header or "")
+    if not m or (not m.group(1) and not m.group(2)):
+        return None  # absent, malformed or multi-range: send the whole thing
+    if not m.group(1):
+        n = int(m.group(2))
+        return (max(0, size - n), size - 1) if n and size else "unsatisfiable"
+    start = int(m.group(1))
+    end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    return (start, end) if start <= end and start < size else "unsatisfiable"
+
+class AssetHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler + Content-Encoding negotiation, ETag/304, Range/206."""
+    protocol_version = "HTTP/1.1"
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, ".json": "application/json",
+                      ".bin": "application/octet-stream", ".js": "text/javascript"}
+
+    def do_GET(self):
+        self._send(body=True)
+
+    def do_HEAD(self):
+        self._send(body=False)
+
+    def _send(self, body):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):  # directories (listing/redirect) and 404s
+            return super().do_GET() if body else super().do_HEAD()
+
+        # representation: best precompressed sibling the client accepts and that is not stale
+        st = os.stat(path)
+        accepted, rep, rep_st, encoding = accepted_encodings(self.headers.get("Accept-Encoding")), path, st, None
+        for enc in ("br", "gzip"):
+            if enc in accepted and enc in ENCODERS:
+                cand = path + ENCODERS[enc][0]
+                if os.path.isfile(cand) and os.stat(cand).st_mtime_ns >= st.st_mtime_ns:
+                    rep, rep_st, encoding = cand, os.stat(cand), enc
+                    break
+        etag = strong_etag(rep, rep_st)
+
+        headers = {
+            "Content-Type": self.guess_type(path),
+            "ETag": etag,
+            "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+            "Cache-Control": IMMUTABLE if HASHED_NAME.search(path) else REVALIDATE,
+            "Accept-Ranges": "bytes",
+            "Vary": "Accept-Encoding",
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        inm = self.headers.get("If-None-Match")
+        if inm and (inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]):
+            return self._reply(HTTPStatus.NOT_MODIFIED, {k: v for k, v in headers.items() if k != "Content-Type"})
+
+        size, start, end, status = rep_st.st_size, 0, rep_st.st_size - 1, HTTPStatus.OK
+        if_range = self.headers.get("If-Range")
+        rng = parse_range(self.headers.get("Range"), size) if if_range in (None, etag) else None
+        if rng == "unsatisfiable":
+            return self._reply(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+                               {**headers, "Content-Range": f"bytes */{size}", "Content-Length": "0"})
+        if rng:
+            (start, end), status = rng, HTTPStatus.PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1 if size else 0)
+        self._reply(status, headers)
+        if body and size:
+            with open(rep, "rb") as f:
+                f.seek(start)
+                _copy(f, self.wfile, end - start + 1)
+
+    def _reply(self, status, headers):
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()  # a 304 has no body by definition: no Content-Length (RFC 9110 8.6)
+
+def _copy(src, dst, n, chunk=1 << 16):
+    while n > 0:
+        block = src.read(min(chunk, n))
+        if not block:
+            break
+        dst.write(block)
+        n -= len(block)
+
+# ---------------------------
+# Server
+# ---------------------------
+def make_server(out_dir, port=PORT, host="127.0.0.1") -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), partial(AssetHandler, directory=str(out_dir)))
+
+def serve(out_dir, page: str, port=PORT, open_browser=True):
+    """Serve out_dir on localhost and open `page` (foreground, Ctrl+C to stop)."""
+    server = make_server(out_dir, port)
+    url = f"http://127.0.0.1:{port}/{page}"
+    print(f"🌐 Serving on {url}  (Ctrl+C to stop; br={'on' if 'br' in ENCODERS else 'off'})")
+    if open_browser:
+        webbrowser.open(url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("👋 Server stopped")
@@ -0,0 +1,73 @@
+# store.py
+# memory-mapped array store: one .npy per array + a small meta.json header
+#
+#   <dir>/meta.json           {"format", "version", "generation", "arrays": {name: {file, dtype, shape}}, ...meta}
+#   <dir>/<name>.<gen>.npy    plain .npy, mapped with np.load(mmap_mode=...)
+#
+# Processes that open the same store share its pages through the OS page cache instead
+# of each reloading the CSVs or receiving a pickled copy: sweep.py's workers, later
+# script runs, or a notebook (open_store("sweep/matrix")). Every write puts its arrays
+# under new file names (the store's generation number) and then swaps in meta.json,
+# which is the commit point: a reader sees either the old store or the new one, never
+# an old meta.json next to a new .npy. Files of the previous generation are kept, so a
+# reader that has just read the old meta.json can still open them; older ones are removed.
+
+import json
+from pathlib import Path
+import numpy as np
+
+STORE_VERSION = 1
+META_NAME = "meta.json"
+
+def write_store(path, arrays: dict, meta=None, update=False) -> Path:
+    """Write `arrays` (name -> array) and meta into the store directory `path`. With update,
+    arrays and meta keys already in the store are kept unless overwritten; without, the
+    store is replaced."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    old = {"arrays": {}}
+    if (path / META_NAME).exists():
+        try:
+            old = read_meta(path)
+        except ValueError:  # not a store (or not this version): fine to replace, not to update
+            if update:
+                raise
+    gen = old.get("generation", 0) + 1
+    specs = dict(old["arrays"]) if update else {}
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        f = path / f"{name}.{gen}.npy"
+        with open(f, "wb") as fh:
+            np.save(fh, a, allow_pickle=False)
+        specs[name] = {"file": f.name, "dtype": a.dtype.str, "shape": list(a.shape)}
+    kept = {k: v for k, v in old.items() if k not in ("format", "version", "generation", "arrays")} if update else {}
+    header = {**kept, **(meta or {}), "format": "embed3d-store", "version": STORE_VERSION, "generation": gen,
+              "arrays": specs}
+    tmp = path / (META_NAME + ".tmp")
+    tmp.write_text(json.dumps(header, indent=2), encoding="utf-8")
+    tmp.replace(path / META_NAME)
+    live = {s["file"] for s in (*specs.values(), *old["arrays"].values())}
+    for f in path.glob("*.npy"):
+        if f.name not in live:
+            f.unlink(missing_ok=True)
+    return path
+
+def read_meta(path) -> dict:
+    meta = json.loads((Path(path) / META_NAME).read_text(encoding="utf-8"))
+    if meta.get("format") != "embed3d-store" or meta.get("version") != STORE_VERSION:
+        raise ValueError(f"{path} is not an embed3d store (v{STORE_VERSION})")
+    return meta
+
+def open_store(path, names=None, mmap_mode="r"):
+    """Returns ({name: memory-mapped array}, meta). mmap_mode="c" gives private
+    copy-on-write pages for consumers that modify their input."""
+    path = Path(path)
+    meta = read_meta(path)
+    arrays = {}
+    for name, spec in meta["arrays"].items():
+        if names is None or name in names:
+            a = np.load(path / spec["file"], mmap_mode=mmap_mode, allow_pickle=False)
+            if a.dtype.str != spec["dtype"] or list(a.shape) != spec["shape"]:
+                raise ValueError(f"{path / spec['file']} does not match {META_NAME}")
+            arrays[name] = a
+    return arrays, meta
@@ -0,0 +1,523 @@
+# viewer.py
+# JS snippets shared by the viewer templates in embed3d/templates/.
+# Templates mark the spot with /*@NAME@*/; render_template() inlines them.
+
+from pathlib import Path
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+BUNDLE_LOADER_JS = r"""
+// --- point bundle (<stem>.manifest.json + <stem>.bin) -> typed arrays, no per-point objects
+// The .bin is a run of row chunks, coarse subsample first (bundle.py). loadBundle resolves
+// as soon as the first chunk has arrived; the rest stream in behind it. Every chunk is
+// copied into the full-length arrays and announced to P.onChunk(fn(start, end)). Coords
+// come already centred and scaled by the generator (manifest.normalization), so P.pos0
+// is the xyz column itself.
+// P.ranges lists the row ranges in so far; P.done settles when nothing is left to stream.
+// With an octree (manifest.lod, lod.py) rows arrive a tile at a time instead, only for
+// the nodes the point cloud asks for through P.lod -- same P, same events.
+const TYPED = {float32:Float32Array, uint8:Uint8Array, int16:Int16Array, uint16:Uint16Array, uint32:Uint32Array};
+const LOD_MAX_REQUESTS = 4;  // tiles in flight at once
+const INT_ID_NONE = 0xFFFFFFFF;  // missing value of an integer ID column (manifest.int_ids)
+
+// merge [start, end) into a sorted list of disjoint ranges
+function addRange(ranges, start, end){
+  ranges.push([start, end]); ranges.sort((a, b) => a[0] - b[0]);
+  let w = 0;
+  for (const r of ranges){ if (w && r[0] <= ranges[w-1][1]) ranges[w-1][1] = Math.max(ranges[w-1][1], r[1]); else ranges[w++] = r; }
+  ranges.length = w;
+}
+
+function pointStore(M){
+  const n = M.count, cols = {};
+  for (const [name, c] of Object.entries(M.columns)) cols[name] = new TYPED[c.dtype](n * c.width);
+
+  let str = () => "";  // IDs read "" until the string table arrives
+  const ids = {}, ints = M.int_ids || {}, cats = {}, attrIdx = {};
+  M.ids.forEach(c => { ids[c] = cols["id:"+c]; });
+  Object.keys(M.categories).forEach(c => { cats[c] = cols["cat:"+c]; });
+  M.attrs.forEach((a, j) => { attrIdx[a] = j; });
+  const k = M.attrs.length, attrs = cols.attrs, label = cols.label, listeners = [];
+
+  const P = {
+    n, manifest: M, loaded: 0, ranges: [], pos0: cols.xyz,
+    label, cluster: cols.cluster,
+    hasId: c => c in ids,
+    id: (c, i) => !(c in ids) ? "" : !(c in ints) ? str(ids[c][i])
+      : ids[c][i] === INT_ID_NONE ? ints[c] : String(ids[c][i]),
+    cat: (c, i) => M.categories[c][cats[c][i]],
+    attr: (a, i) => attrs[i*k + attrIdx[a]],
+    labelName: i => M.label_names[label[i]] ?? String(label[i]),
+    onChunk: fn => { listeners.push(fn); },
+    has: i => P.ranges.some(([s, e]) => i >= s && i < e),
+    // resolves once row i is in (search results may point at rows not loaded yet)
+    ensure: i => P.has(i) ? Promise.resolve(P) : (P.fetchRow ? P.fetchRow(i) : P.done),
+    // rows [start, start+count) of every column, at offsets[name] in `buf`
+    put(buf, offsets, start, count){
+      for (const [name, off] of Object.entries(offsets)){
+        const c = M.columns[name];
+        cols[name].set(new TYPED[c.dtype](buf, off, count * c.width), start * c.width);
+      }
+      addRange(P.ranges, start, start + count); P.loaded += count;
+      listeners.forEach(fn => fn(start, start + count));
+    },
+    // NUL-terminated utf-8 string table behind P.id()
+    setStrings(bytes, count){
+      const offs = new Uint32Array(count + 1);
+      for (let j=0, c=1; j<bytes.length; j++) if (bytes[j]===0) offs[c++] = j + 1;
+      const dec = new TextDecoder(), memo = new Map();
+      str = key => {
+        let s = memo.get(key);
+        if (s === undefined){ s = dec.decode(bytes.subarray(offs[key], offs[key+1] - 1)); memo.set(key, s); }
+        return s;
+      };
+    },
+  };
+  return P;
+}
+
+async function loadBundle(manifestUrl){
+  const mres = await fetch(manifestUrl, {cache:"no-cache"});
+  if(!mres.ok) throw new Error("Failed to load manifest: "+mres.status);
+  const M = await mres.json();
+  if (M.lod) return loadLod(M, new URL(M.lod, mres.url));
+  const bres = await fetch(new URL(M.bin, mres.url));  // content-addressed: immutable
+  if(!bres.ok) throw new Error("Failed to load points: "+bres.status);
+
+  const P = pointStore(M), buf = new Uint8Array(M.bytes);
+  let got = 0, next = 0, strReady = false, first;
+  const firstChunk = new Promise(r => { first = r; });
+  const unpack = () => {
+    while (next < M.chunks.length && got >= M.chunks[next].end){
+      const ch = M.chunks[next++];
+      P.put(buf.buffer, ch.arrays, ch.start, ch.count);
+      if (next === 1) first(P);
+    }
+    const S = M.strings.data;
+    if (!strReady && got >= S.offset + S.length){
+      strReady = true;
+      P.setStrings(new Uint8Array(buf.buffer, S.offset, S.length), M.strings.count);
+    }
+  };
+  P.done = (async () => {
+    if (bres.body && bres.body.getReader){
+      const reader = bres.body.getReader();
+      for (;;){
+        const {done, value} = await reader.read();
+        if (done) break;
+        if (got + value.length > buf.length) throw new Error("Point bundle larger than its manifest says");
+        buf.set(value, got); got += value.length; unpack();
+      }
+    } else { buf.set(new Uint8Array(await bres.arrayBuffer())); got = buf.length; unpack(); }
+    if (got < buf.length) throw new Error("Point bundle truncated");
+    return P;
+  })();
+  P.done.catch(err => console.warn(err));
+  return Promise.race([firstChunk, P.done]);
+}
+
+// octree tiles: resolves with the root node in; P.lod.request(k) fetches more on demand
+async function loadLod(M, url){
+  const hres = await fetch(url, {cache:"no-cache"});
+  if(!hres.ok) throw new Error("Failed to load LOD hierarchy: "+hres.status);
+  const H = await hres.json(), base = new URL(H.tiles, hres.url);
+  const P = pointStore(M), {center, half} = H.cube;
+  // node cubes (same space as P.pos0); state 0 = not requested, 1 = in flight, 2 = in, 3 = failed
+  const nodes = H.nodes.map(nd => {
+    const side = 2 * half / 2**nd.level;
+    const c = [0, 1, 2].map(a => center[a] - half + (nd.cell[a] + 0.5) * side);
+    return {...nd, center: c, half: side / 2, state: 0, promise: null};
+  });
+  let inflight = 0;
+  const load = k => {
+    const nd = nodes[k];
+    if (nd.promise) return nd.promise;
+    nd.state = 1; inflight++;
+    return nd.promise = fetch(new URL(nd.bin, base))  // content-addressed: immutable
+      .then(r => { if(!r.ok) throw new Error("Failed to load tile "+nd.id+": "+r.status); return r.arrayBuffer(); })
+      .then(buf => { P.put(buf, nd.arrays, nd.start, nd.count); nd.state = 2; return P; })
+      .catch(err => { nd.state = 3; console.warn(err); return P; })
+      .finally(() => { inflight--; });
+  };
+  P.lod = {nodes, request(k){ if (nodes[k].state === 0 && inflight < LOD_MAX_REQUESTS) load(k); }};
+  P.fetchRow = i => {  // nodes are contiguous row ranges in breadth-first = ascending start order
+    let a = 0, b = nodes.length - 1;
+    while (a < b){ const m = (a + b + 1) >> 1; if (nodes[m].start <= i) a = m; else b = m - 1; }
+    return load(a);
+  };
+  P.done = nodes.length ? load(0) : Promise.resolve(P);
+  P.done
+    .then(() => fetch(new URL(H.strings.bin, base)))
+    .then(r => { if(!r.ok) throw new Error("Failed to load ID strings: "+r.status); return r.arrayBuffer(); })
+    .then(b => P.setStrings(new Uint8Array(b), H.strings.count))
+    .catch(err => console.warn(err));
+  return P.done;
+}
+
+// live preview: the preview server's page script calls window.embed3dRefresh() when a new
+// bundle is written. Once both P and the new bundle are fully in, the new arrays replace
+// P's contents and apply(P) refreshes the scene (never fires on static hosting).
+function onBundleUpdate(P, manifestUrl, apply){
+  window.embed3dRefresh = () => Promise.all([P.done.catch(() => null), loadBundle(manifestUrl).then(Q => Q.done)])
+    .then(([, Q]) => { Object.assign(P, Q); apply(P); });
+}
+"""
+
+POINT_CLOUD_JS = r"""
+// --- every point in one THREE.Points draw call: sphere-impostor sprites, per-vertex colour
+const POINT_VS = `
+  attribute vec3 aColor; attribute float aScale;
+  uniform float uRadius, uSize, uScale;
+  varying vec3 vColor;
+  #include <fog_pars_vertex>
+  void main(){
+    vColor = aColor;
+    vec4 mvPosition = modelViewMatrix * vec4(position, 1.0);
+    gl_PointSize = 2.0 * uRadius * uSize * aScale * uScale / -mvPosition.z;
+    gl_Position = projectionMatrix * mvPosition;
+    #include <fog_vertex>
+  }`;
+const POINT_FS = `
+  varying vec3 vColor;
+  #include <fog_pars_fragment>
+  void main(){
+    vec2 p = gl_PointCoord * 2.0 - 1.0; float r2 = dot(p, p);
+    if (r2 > 1.0) discard;
+    vec3 nrm = vec3(p.x, -p.y, sqrt(1.0 - r2));
+    float diff = max(dot(nrm, normalize(vec3(0.4, 0.6, 0.7))), 0.0);
+    gl_FragColor = vec4(vColor * (0.55 + 0.45 * diff) + vec3(0.25) * pow(diff, 24.0), 1.0);
+    #include <fog_fragment>
+  }`;
+
+// Buffers are sized for all P.n rows up front, but only rows that have arrived are drawn:
+// one geometry group per run of loaded rows or, with an octree (P.lod), per node picked
+// for the current view by update(camera) -- nearest/largest on screen first, refined
+// while a node covers LOD_MIN_PX and stopping at LOD_BUDGET points, so the cost of a
+// frame does not grow with the catalog. New rows are coloured and uploaded as they land.
+const LOD_BUDGET = 1000000;  // points drawn per frame with an octree
+const LOD_MIN_PX = 100;      // open a node's children while its bounding sphere spans this many px
+function createPointCloud(P, radius){
+  let n, geom, pos, col, scl;
+  const build = () => {
+    n = P.n; geom = new THREE.BufferGeometry();
+    pos = new THREE.BufferAttribute(P.pos0, 3);  // written only as rows arrive: spread is the object scale
+    col = new THREE.BufferAttribute(new Float32Array(3*n), 3);
+    scl = new THREE.BufferAttribute(new Float32Array(n).fill(1), 1);
+    geom.setAttribute('position', pos); geom.setAttribute('aColor', col); geom.setAttribute('aScale', scl);
+    return geom;
+  };
+  build();
+  const mat = new THREE.ShaderMaterial({
+    uniforms: THREE.UniformsUtils.merge([THREE.UniformsLib.fog, {uRadius:{value:radius}, uSize:{value:1}, uScale:{value:1}}]),
+    vertexShader: POINT_VS, fragmentShader: POINT_FS, fog: true,
+  });
+  const points = new THREE.Points(geom, [mat]);  // material array: draws geom.groups only
+  points.frustumCulled = false;                  // bounds are not known until every row is in
+  let hot = -1, colorOf = () => 0xffffff, drawn = [], indexes = new Map(), dirty = null;
+  const invWorld = new THREE.Matrix4(), viewProj = new THREE.Matrix4(), frustum = new THREE.Frustum();
+  const box = new THREE.Box3(), v = new THREE.Vector3();
+  const paint = (start, end) => {
+    const c = col.array, tmp = new THREE.Color(), memo = new Map();
+    for (let i=start; i<end; i++){
+      const key = colorOf(i); let rgb = memo.get(key);
+      if (!rgb){ tmp.set(key); rgb = [tmp.r, tmp.g, tmp.b]; memo.set(key, rgb); }
+      c[3*i] = rgb[0]; c[3*i+1] = rgb[1]; c[3*i+2] = rgb[2];
+    }
+  };
+  // position/colour rows changed since the last frame, uploaded as one range by update()
+  const mark = (start, end) => { dirty = dirty ? [Math.min(dirty[0], start), Math.max(dirty[1], end)] : [start, end]; };
+  const flush = () => {
+    if (!dirty) return;
+    for (const a of [pos, col]){ a.updateRange.offset = 3*dirty[0]; a.updateRange.count = 3*(dirty[1]-dirty[0]); a.needsUpdate = true; }
+    dirty = null;
+  };
+  // rows to draw as [start, end) runs; adjacent runs share a draw call
+  const setDrawn = rs => {
+    drawn = rs; geom.clearGroups();
+    const sorted = rs.slice().sort((a, b) => a[0] - b[0]);
+    for (let j=0; j<sorted.length;){
+      const s = sorted[j][0]; let e = sorted[j++][1];
+      while (j < sorted.length && sorted[j][0] === e) e = sorted[j++][1];
+      geom.addGroup(s, e - s, 0);
+    }
+  };
+  const onRows = (start, end) => {
+    paint(start, end); mark(start, end);
+    if (!P.lod) setDrawn(P.ranges.map(r => r.slice()));
+  };
+  const select = camera => {
+    const L = P.lod, s = points.scale.x, px = mat.uniforms.uScale.value;
+    points.updateMatrixWorld(); camera.updateMatrixWorld();
+    frustum.setFromProjectionMatrix(viewProj.multiplyMatrices(camera.projectionMatrix, camera.matrixWorldInverse));
+    const inView = nd => {
+      box.min.set(nd.center[0]-nd.half, nd.center[1]-nd.half, nd.center[2]-nd.half).multiplyScalar(s);
+      box.max.set(nd.center[0]+nd.half, nd.center[1]+nd.half, nd.center[2]+nd.half).multiplyScalar(s);
+      return frustum.intersectsBox(box);
+    };
+    const onScreen = nd => {  // projected radius of the node's bounding sphere, px
+      const r = nd.half * s * Math.sqrt(3), d = v.set(nd.center[0], nd.center[1], nd.center[2]).multiplyScalar(s).distanceTo(camera.position);
+      return d > r ? r / d * px : Infinity;
+    };
+    const queue = [[Infinity, 0]], rs = [];
+    let budget = LOD_BUDGET;
+    while (queue.length){
+      let b = 0; for (let j=1; j<queue.length; j++) if (queue[j][0] > queue[b][0]) b = j;
+      const k = queue[b][1]; queue[b] = queue[queue.length-1]; queue.pop();
+      const nd = L.nodes[k];
+      if (nd.state !== 2){ L.request(k); continue; }
+      if (nd.count > budget) break;
+      budget -= nd.count; rs.push([nd.start, nd.start + nd.count]);
+      for (const c of nd.children){
+        const ch = L.nodes[c]; if (!inView(ch)) continue;
+        const r = onScreen(ch); if (r >= LOD_MIN_PX) queue.push([r, c]);
+      }
+    }
+    if (rs.length !== drawn.length || rs.some((r, j) => r[0] !== drawn[j][0])) setDrawn(rs);
+  };
+  P.ranges.forEach(([s, e]) => onRows(s, e));
+  P.onChunk(onRows);
+  return {
+    points,
+    // fn(i) -> anything THREE.Color.set() accepts; called once per point per mode switch
+    // and kept for the rows that arrive later
+    setColors(fn){ colorOf = fn; for (const [s, e] of P.ranges){ paint(s, e); mark(s, e); } },
+    // once per frame, before render: octree node selection + pending uploads
+    update(camera){ if (P.lod) select(camera); flush(); },
+    // O(1) per slider event: spread is a uniform object scale (raycasting honours it),
+    // point size a shader uniform
+    setSpread(spread){ points.scale.setScalar(spread); },
+    setSize(s){ mat.uniforms.uSize.value = s; },
+    // world-space diameter -> pixels for the current drawing-buffer height and fov
+    setViewport(heightPx, fovDeg){ mat.uniforms.uScale.value = heightPx / (2*Math.tan(fovDeg*Math.PI/360)); },
+    highlight(i, factor){
+      if (hot === i) return;
+      if (hot >= 0) scl.array[hot] = 1;
+      if (i >= 0) scl.array[i] = factor;
+      hot = i; scl.needsUpdate = true;
+    },
+    // BVH pick over the drawn rows (one index per run, built on first use) in the cloud's
+    // local frame; `thr` is the world-space hover radius
+    pick(raycaster, thr){
+      points.updateMatrixWorld();
+      const local = raycaster.ray.clone().applyMatrix4(invWorld.copy(points.matrixWorld).invert());
+      const keep = new Map();
+      let best = -1, bestT = Infinity;
+      for (const [s, e] of drawn){
+        const key = s + ":" + e, index = indexes.get(key) || buildPointIndex(P.pos0, e - s, 16, s);
+        keep.set(key, index);
+        const hit = index.pick(local.origin, local.direction, thr / points.scale.x, bestT);
+        if (hit.i >= 0){ best = hit.i; bestT = hit.t; }
+      }
+      indexes = keep;
+      return best;
+    },
+    position(i){ return new THREE.Vector3(pos.array[3*i], pos.array[3*i+1], pos.array[3*i+2]).multiplyScalar(points.scale.x); },
+    // new bundle, same draw call: same size -> the GPU buffers take the new arrays, else a
+    // fresh geometry (colours are reset; the caller re-applies its colour mode)
+    setData(Q){
+      P = Q; hot = -1; indexes = new Map();
+      if (Q.n === n){
+        pos.array = Q.pos0; mark(0, n);
+        scl.array.fill(1); scl.needsUpdate = true;
+      } else {
+        const old = geom; points.geometry = build(); old.dispose();
+      }
+      setDrawn(P.lod ? [] : P.ranges.map(r => r.slice()));
+      P.onChunk(onRows);
+    },
+  };
+}
+"""
+
+POINT_INDEX_JS = r"""
+// --- static BVH over the normalized coords (leaves of <=16 points) for hover picking
+function buildPointIndex(pos, n, leafSize, first){
+  leafSize = leafSize || 16; first = first || 0;  // indexes rows first .. first+n-1
+  const order = new Uint32Array(n); for (let i=0; i<n; i++) order[i] = first + i;
+  const maxNodes = 4 * Math.ceil(n / leafSize) + 1;  // leaves hold more than leafSize/2 points
+  const box = new Float32Array(6*maxNodes), meta = new Int32Array(4*maxNodes);  // start,count,left,right
+  let used = 0;
+  const select = (lo, hi, k, ax) => {  // quickselect order[lo..hi] so order[k] is the median on `ax`
+    while (hi > lo){
+      const pv = pos[3*order[(lo+hi)>>1]+ax]; let i = lo, j = hi;
+      while (i <= j){
+        while (pos[3*order[i]+ax] < pv) i++;
+        while (pos[3*order[j]+ax] > pv) j--;
+        if (i <= j){ const t = order[i]; order[i] = order[j]; order[j] = t; i++; j--; }
+      }
+      if (k <= j) hi = j; else if (k >= i) lo = i; else return;
+    }
+  };
+  const stack = [[0, n, -1, 0]];  // start, count, parent, side
+  while (stack.length){
+    const [start, count, parent, side] = stack.pop(), id = used++;
+    if (parent >= 0) meta[4*parent + 2 + side] = id;
+    let b = [Infinity, Infinity, Infinity, -Infinity, -Infinity, -Infinity];
+    for (let k=start; k<start+count; k++){
+      const o = 3*order[k];
+      for (let a=0; a<3; a++){ const v = pos[o+a]; if (v<b[a]) b[a]=v; if (v>b[3+a]) b[3+a]=v; }
+    }
+    box.set(b, 6*id);
+    meta[4*id] = start; meta[4*id+1] = count; meta[4*id+2] = meta[4*id+3] = -1;
+    if (count > leafSize){
+      const ext = [b[3]-b[0], b[4]-b[1], b[5]-b[2]], ax = ext.indexOf(Math.max(...ext));
+      const half = count >> 1;
+      select(start, start+count-1, start+half, ax);
+      stack.push([start+half, count-half, id, 1], [start, half, id, 0]);
+    }
+  }
+  // nearest point along the ray (origin o, unit dir d) within `thr` of it and closer
+  // than maxT: {i, t}, i = -1 if none
+  function pick(o, d, thr, maxT){
+    const thr2 = thr*thr, inv = [1/d.x, 1/d.y, 1/d.z], org = [o.x, o.y, o.z];
+    let best = -1, bestT = maxT === undefined ? Infinity : maxT;
+    const todo = [0];
+    while (todo.length){
+      const id = todo.pop();
+      let t0 = 0, t1 = bestT;
+      for (let a=0; a<3 && t0<=t1; a++){
+        let ta = (box[6*id+a]-thr-org[a])*inv[a], tb = (box[6*id+3+a]+thr-org[a])*inv[a];
+        if (ta > tb){ const t = ta; ta = tb; tb = t; }
+        if (ta > t0) t0 = ta; if (tb < t1) t1 = tb;
+      }
+      if (t0 > t1) continue;
+      if (meta[4*id+2] >= 0){ todo.push(meta[4*id+2], meta[4*id+3]); continue; }
+      for (let k=meta[4*id]; k<meta[4*id]+meta[4*id+1]; k++){
+        const i = order[k], px = pos[3*i]-org[0], py = pos[3*i+1]-org[1], pz = pos[3*i+2]-org[2];
+        const t = px*d.x + py*d.y + pz*d.z;
+        if (t < 0 || t >= bestT) continue;
+        if (px*px + py*py + pz*pz - t*t <= thr2){ best = i; bestT = t; }
+      }
+    }
+    return {i: best, t: bestT};
+  }
+  return {pick, nodes: used};
+}
+
+// run fn(lastEvent) at most once per animation frame
+function throttleFrame(fn){
+  let ev = null, queued = false;
+  const h = e => { ev = e; if (!queued){ queued = true; requestAnimationFrame(() => { queued = false; if (ev) fn(ev); }); } };
+  h.cancel = () => { ev = null; };
+  return h;
+}
+"""
+
+SEARCH_JS = r"""
+// --- prebuilt ID search (<stem>.search.json + .bin, trigram shards in <stem>.search/):
+// sorted exact/prefix, trigram substring. Nothing is fetched until the first query, and a
+// substring query fetches only the shard holding its rarest trigram's posting list.
+async function loadSearchIndex(manifestUrl){
+  let index = null;
+  const load = async () => {
+    const mres = await fetch(manifestUrl, {cache:"no-cache"});
+    if(!mres.ok) throw new Error("Failed to load search index: "+mres.status);
+    const M = await mres.json();
+    const bres = await fetch(new URL(M.bin, mres.url));  // content-addressed: immutable
+    if(!bres.ok) throw new Error("Failed to load search index: "+bres.status);
+    const buf = await bres.arrayBuffer();
+    const A = {}; for (const [name, a] of Object.entries(M.arrays)) A[name] = new TYPED[a.dtype](buf, a.offset, a.length);
+    return makeSearch(M, A, mres.url);
+  };
+  return {search: (query, limit) => {
+    index = index || load().catch(err => { index = null; throw err; });  // retry on the next query
+    return index.then(ix => ix(query, limit));
+  }};
+}
+
+function makeSearch(M, A, baseUrl){
+  const keys = new Array(M.keys), dec = new TextDecoder(), enc = new TextEncoder();
+  for (let j=0, s=0, k=0; j<A.keys.length; j++) if (A.keys[j]===0){ keys[k++] = dec.decode(A.keys.subarray(s, j)); s = j + 1; }
+  const G = A.tri_code.length, shards = new Map();
+  // IDs are stored bare ("993.01"), so "TOI-993.01" / "TIC 2593..." / "KIC 1079..." drop the catalog prefix
+  const norm = q => q.trim().toLowerCase().replace(/\s+/g, ' ').replace(/^(toi|tic|tid|kic)[-\s]*(?=\d)/, '')
+    .replace(/^(\d+)\.0$/, '$1');  // as search.py normalize_query
+  const lowerBound = (arr, lo, hi, v) => { while (lo < hi){ const m = (lo+hi)>>1; if (arr[m] < v) lo = m+1; else hi = m; } return lo; };
+  const postings = async t => {  // key ids containing trigram t, from its (cached) shard
+    let s = 0; while (s+1 < M.shards.length && M.shards[s+1].first <= t) s++;
+    if (!shards.has(s)) shards.set(s, fetch(new URL(M.shards[s].file, baseUrl)).then(r => {
+      if(!r.ok) throw new Error("Failed to load search shard: "+r.status);
+      return r.arrayBuffer();
+    }).then(b => new TYPED[M.tri_key.dtype](b)).catch(err => { shards.delete(s); throw err; }));
+    const base = A.tri_off[M.shards[s].first];
+    return (await shards.get(s)).subarray(A.tri_off[t] - base, A.tri_off[t+1] - base);
+  };
+  const substr = async (key, b, cap) => {
+    let best = -1;
+    for (let j=0; j+2<b.length; j++){
+      const g = (b[j]<<16) | (b[j+1]<<8) | b[j+2], t = lowerBound(A.tri_code, 0, G, g);
+      if (t >= G || A.tri_code[t] !== g) return [];
+      if (best < 0 || A.tri_off[t+1]-A.tri_off[t] < A.tri_off[best+1]-A.tri_off[best]) best = t;
+    }
+    const list = await postings(best), out = [];
+    for (let j=0; j<list.length && out.length<cap; j++) if (keys[list[j]].includes(key)) out.push(list[j]);
+    return out;
+  };
+
+  // ranked matches: exact < prefix < word-start substring < substring, then shorter key, then column order
+  return async function search(query, limit){
+    limit = limit || 10;
+    const key = norm(query); if (!key) return [];
+    const b = enc.encode(key), rank = new Map(), cap = Math.max(64, 8*limit);  // candidate keys per tier
+    const lo = lowerBound(keys, 0, keys.length, key);
+    for (let k = lo; k<keys.length && rank.size<cap && keys[k].startsWith(key); k++) rank.set(k, keys[k] === key ? 0 : 1);
+    if (b.length >= 3) for (const k of await substr(key, b, cap)) if (!rank.has(k)){ const at = keys[k].indexOf(key); rank.set(k, /[a-z0-9]/.test(keys[k][at-1] || ' ') ? 3 : 2); }
+    const order = [...rank.keys()].sort((p, q) => rank.get(p) - rank.get(q) || keys[p].length - keys[q].length || (keys[p] < keys[q] ? -1 : 1));
+    const out = [], seen = new Set();
+    for (const k of order){
+      for (let j=A.post_off[k]; j<A.post_off[k+1] && out.length<limit; j++){
+        const i = A.post_row[j]; if (seen.has(i)) continue;
+        seen.add(i); out.push({i, col: M.ids[A.post_col[j]], key: keys[k], rank: rank.get(k)});
+      }
+      if (out.length >= limit) break;
+    }
+    return out;
+  };
+}
+
+// results dropdown under a text input; onPick(i) when a row is chosen (click or Enter = first)
+function attachSearch(input, list, index, describe, onPick){
+  let hits = [], pending = Promise.resolve(), seq = 0;
+  const render = () => {
+    list.innerHTML = hits.map((h, j) => `<li data-j="${j}">${describe(h)}</li>`).join('');
+    list.style.display = hits.length ? 'block' : 'none';
+  };
+  const choose = h => { hits = []; render(); onPick(h.i); };
+  const run = () => {  // the index may still be fetching: only the latest query's answer is shown
+    const s = ++seq;
+    pending = Promise.resolve(index.search(input.value, 10))
+      .then(h => { if (s === seq){ hits = h; render(); } }, err => console.warn(err));
+    return pending;
+  };
+  input.addEventListener('input', run);
+  input.addEventListener('keydown', e => {
+    if (e.key === 'Escape'){ seq++; hits = []; render(); return; }
+    if (e.key !== 'Enter') return;
+    (hits.length ? pending : run()).then(() => {
+      if (hits.length){ choose(hits[0]); setTimeout(() => input.value = '', 1500); }
+      else { input.style.borderColor = '#ff4444'; setTimeout(() => input.style.borderColor = '', 500); }
+    });
+  });
+  list.addEventListener('mousedown', e => {
+    const li = e.target.closest('li'); if (!li) return;
+    e.preventDefault(); choose(hits[+li.dataset.j]);
+  });
+  input.addEventListener('blur', () => { list.style.display = 'none'; });
+  input.addEventListener('focus', () => { if (hits.length) list.style.display = 'block'; });
+}
+"""
+
+SNIPPETS = {
+    "BUNDLE_LOADER": BUNDLE_LOADER_JS,
+    "POINT_CLOUD": POINT_CLOUD_JS,
+    "POINT_INDEX": POINT_INDEX_JS,
+    "SEARCH": SEARCH_JS,
+}
+
+def inline_snippets(html: str) -> str:
+    for name, js in SNIPPETS.items():
+        html = html.replace(f"/*@{name}@*/", js.strip("\n"))
+    return html
+
+def render_template(name: str) -> str:
+    return inline_snippets((TEMPLATE_DIR / name).read_text(encoding="utf-8"))
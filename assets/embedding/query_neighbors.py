@@ -0,0 +1,64 @@
+# query_neighbors.py
+# batch "similar objects" lookup in a <stem>.neighbors/ index (written by any
+# make_*_embedding.py run with --knn)
+#
+#   python query_neighbors.py tnsa_tsne3d_points.neighbors "TOI-700.01" 261136679 -k 5
+#   python query_neighbors.py tnsa_tsne3d_points.neighbors --file tois.txt \
+#       --source KOI --label CONFIRMED --space features --json > analogues.jsonl
+#
+# A query is any ID value (kepid, kepler_name, toi, tid, ...); an ID shared by several
+# rows (a kepid with several KOIs) answers for each of them. Without --source/--label
+# the precomputed lists are read as-is; with them, only matching rows are searched.
+
+import sys, json, argparse
+
+from embed3d.neighbors import NeighborIndex, SPACES
+
+# ---------------------------
+# CLI
+# ---------------------------
+p = argparse.ArgumentParser()
+p.add_argument("index", help="<stem>.neighbors directory")
+p.add_argument("queries", nargs="*", help="ID values to look up")
+p.add_argument("--file", default=None, help="more queries, one per line ('-' = stdin)")
+p.add_argument("--space", choices=SPACES, default="features",
+               help="features = standardized feature space, xyz = the 3D layout")
+p.add_argument("-k", type=int, default=None, help="neighbors per query (default: the index's k)")
+p.add_argument("--source", default=None, help="only neighbors from this source (e.g. KOI, TESS)")
+p.add_argument("--label", default=None, help="only neighbors with this label name (e.g. CONFIRMED)")
+p.add_argument("--json", action="store_true", help="one JSON object per query row instead of a table")
+args = p.parse_args()
+
+queries = list(args.queries)
+if args.file:
+    lines = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    queries += [q.strip() for q in lines if q.strip()]
+if not queries:
+    p.error("no queries")
+
+index = NeighborIndex(args.index)
+mask = index.mask(source=args.source, label=args.label)
+
+# ---------------------------
+# Lookup
+# ---------------------------
+missing = 0
+for q in queries:
+    rows = index.rows(q)
+    if not rows:
+        missing += 1
+        print(f"⚠️  {q}: no such ID", file=sys.stderr)
+    for i in rows:
+        nb, dist = index.neighbors(i, args.space, args.k, mask)
+        if args.json:
+            print(json.dumps({"query": q, "row": int(i), **index.record(i), "space": args.space,
+                              "neighbors": [{"row": int(j), **index.record(j), "dist": round(float(d), 6)}
+                                            for j, d in zip(nb, dist)]}))
+            continue
+        rec = index.record(i)
+        print(f"{q} -> {index.name(i)} ({rec['source']}, {rec['label']})  [{args.space}]")
+        for r, (j, d) in enumerate(zip(nb, dist), 1):
+            nrec = index.record(j)
+            print(f"  {r:3d}  {d:9.4f}  {nrec['source']:<6} {nrec['label']:<16} {index.name(j)}")
+if missing:
+    sys.exit(1)
@@ -0,0 +1,187 @@
+# sweep.py
+# fit a grid of projector/clusterer configurations in parallel and write one viewer per
+# configuration plus an index page; exits when done (no server)
+#
+#   python sweep.py --script comb --projector tsne umap --perplexity 10 30 50 \
+#       --n_neighbors 15 50 --seed 0 42 --workers 4 --out_dir sweep -- --dataset both
+#
+# The script is run once with --export_matrix to load/filter/scale the data into a
+# memory-mapped store (<out_dir>/matrix, embed3d/store.py); every fit then runs in a
+# process pool that maps that one matrix and lands in the embedding artifact cache, so
+# the per-configuration script runs that package the outputs are cache hits. Each fit's
+# coords/clabels are added to the store as <slug>.coords / <slug>.clabels, so a notebook
+# can compare every layout with open_store("<out_dir>/matrix").
+
+import json, sys, time, argparse, itertools, html, subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from embed3d.artifacts import load_artifacts, save_artifacts, DEFAULT_MAX_BYTES
+from embed3d.fit import fit_key, fit_embedding, import_matrix
+from embed3d.store import write_store
+from embed3d.projectors import TSNE_BACKENDS
+from embed3d.clustering import CLUSTERERS
+
+HERE = Path(__file__).resolve().parent
+SCRIPTS = {  # name -> (script, viewer file it writes)
+    "koi":  ("make_koi_embedding.py",  "viewer.html"),
+    "tess": ("make_tess_embedding.py", "viewer_tess.html"),
+    "comb": ("make_comb_embedding.py", "viewer_comb.html"),
+}
+
+# ---------------------------
+# CLI (anything unrecognised, e.g. after "--", is passed through to the script)
+# ---------------------------
+p = argparse.ArgumentParser()
+p.add_argument("--script", choices=list(SCRIPTS), default="comb")
+p.add_argument("--out_dir", default="sweep")
+p.add_argument("--projector", nargs="+", choices=["tsne","umap","pca"], default=["tsne"])
+p.add_argument("--tsne_backend", "--tsne-backend", choices=["auto"] + list(TSNE_BACKENDS), default="auto")
+p.add_argument("--perplexity", nargs="+", type=float, default=[None])
+p.add_argument("--n_neighbors", nargs="+", type=int, default=[15])
+p.add_argument("--min_dist", nargs="+", type=float, default=[0.1])
+p.add_argument("--clusterer", nargs="+", choices=["auto"] + list(CLUSTERERS), default=["auto"])
+p.add_argument("--cluster_sample", type=int, default=0)
+p.add_argument("--cluster_batch", type=int, default=4096)
+p.add_argument("--min_cluster_size", nargs="+", type=int, default=[None])
+p.add_argument("--n_clusters", nargs="+", type=int, default=[None])
+p.add_argument("--seed", nargs="+", type=int, default=[42])
+p.add_argument("--workers", type=int, default=4, help="parallel fits")
+p.add_argument("--n_jobs", type=int, default=1, help="threads per fit")
+p.add_argument("--force", action="store_true", help="refit configurations that are already cached")
+p.add_argument("--cache_max_mb", type=int, default=DEFAULT_MAX_BYTES >> 20)
+args, passthrough = p.parse_known_args()
+passthrough = [a for a in passthrough if a != "--"]
+
+OUT_DIR = Path(args.out_dir).resolve()
+OUT_DIR.mkdir(parents=True, exist_ok=True)
+SCRIPT, VIEWER = SCRIPTS[args.script]
+
+# ---------------------------
+# Grid (projector-specific knobs only multiply their own projector)
+# ---------------------------
+def grid():
+    clusters = list(itertools.product(dict.fromkeys(args.clusterer), args.min_cluster_size, args.n_clusters, args.seed))
+    for proj in dict.fromkeys(args.projector):
+        knobs = {"tsne": itertools.product(args.perplexity, [15], [0.1]),
+                 "umap": itertools.product([None], args.n_neighbors, args.min_dist),
+                 "pca":  [(None, 15, 0.1)]}[proj]
+        for (perp, nn, md), (clus, mcs, k, seed) in itertools.product(list(knobs), clusters):
+            yield {"projector": proj, "tsne_backend": args.tsne_backend, "perplexity": perp,
+                   "n_neighbors": nn, "min_dist": md, "clusterer": clus, "min_cluster_size": mcs, "n_clusters": k,
+                   "cluster_sample": args.cluster_sample, "cluster_batch": args.cluster_batch, "seed": seed}
+
+def slug(cfg) -> str:
+    parts = [cfg["projector"]]
+    if cfg["projector"] == "tsne" and cfg["perplexity"] is not None:
+        parts.append(f"p{cfg['perplexity']:g}")
+    if cfg["projector"] == "umap":
+        parts.append(f"nn{cfg['n_neighbors']}-md{cfg['min_dist']:g}")
+    if cfg["clusterer"] != "auto":
+        parts.append(cfg["clusterer"])
+    if cfg["min_cluster_size"] is not None:
+        parts.append(f"mcs{cfg['min_cluster_size']}")
+    if cfg["n_clusters"] is not None:
+        parts.append(f"k{cfg['n_clusters']}")
+    parts.append(f"s{cfg['seed']}")
+    return "-".join(parts)
+
+def script_flags(cfg) -> list:
+    flags = ["--projector", cfg["projector"], "--tsne_backend", cfg["tsne_backend"], "--seed", str(cfg["seed"]),
+             "--n_neighbors", str(cfg["n_neighbors"]), "--min_dist", repr(cfg["min_dist"]),
+             "--clusterer", cfg["clusterer"], "--cluster_sample", str(cfg["cluster_sample"]),
+             "--cluster_batch", str(cfg["cluster_batch"])]
+    for f in ("perplexity", "min_cluster_size", "n_clusters"):
+        if cfg[f] is not None:
+            flags += [f"--{f}", repr(cfg[f])]
+    return flags
+
+# ---------------------------
+# Pool workers map the scaled matrix from the store (shared pages, nothing pickled)
+# ---------------------------
+_X_SCALED = None
+
+def _init(store):
+    global _X_SCALED
+    _X_SCALED = import_matrix(store, mmap_mode="c")[1]  # copy-on-write: projectors may touch their input
+
+def _fit(cfg, k_cap, n_jobs):
+    return fit_embedding(_X_SCALED, cfg, k_cap, n_jobs=n_jobs)
+
+def _package(cfg):
+    out = OUT_DIR / slug(cfg)
+    out.mkdir(exist_ok=True)
+    cmd = [sys.executable, str(HERE / SCRIPT), "--out_dir", str(out), "--no_serve", *script_flags(cfg), *passthrough]
+    with open(out / "log.txt", "w", encoding="utf-8") as log:
+        return subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT).returncode
+
+if __name__ == "__main__":
+    configs = list(grid())
+    print(f"▶ {len(configs)} configurations of {SCRIPT}")
+
+    # 1) load + filter + scale once
+    store = OUT_DIR / "matrix"
+    subprocess.run([sys.executable, str(HERE / SCRIPT), "--export_matrix", str(store), *passthrough], check=True)
+    X, X_scaled, meta = import_matrix(store)
+    art_dir, k_cap = meta["art_dir"], meta["k_cap"]
+    keys = {slug(c): fit_key(meta["inputs"], X, meta["base"], c, k_cap) for c in configs}
+    print(f"   {X.shape[0]:,} rows x {X.shape[1]} features")
+
+    # 2) fit everything not already cached
+    results = {s: {"cached": True} for s in keys}
+    todo = [c for c in configs if args.force or load_artifacts(art_dir, keys[slug(c)]) is None]
+    t_fit = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init, initargs=(str(store),)) as pool:
+        futs = {pool.submit(_fit, c, k_cap, args.n_jobs): c for c in todo}
+        for fut in as_completed(futs):
+            c = futs[fut]
+            coords, clabels, proj_used, clus_used, timings = fut.result()
+            secs = timings["project_s"] + timings["cluster_s"]
+            if "fallback" not in proj_used:
+                save_artifacts(art_dir, keys[slug(c)], {"X_scaled": X_scaled, "coords": coords, "clabels": clabels},
+                               {"projector": proj_used, "clustering": clus_used}, max_bytes=args.cache_max_mb << 20)
+            write_store(store, {f"{slug(c)}.coords": coords, f"{slug(c)}.clabels": clabels}, update=True)
+            results[slug(c)] = {"cached": False, "fit_s": round(secs, 2), **timings, "projector": proj_used, "clustering": clus_used}
+            print(f"   fitted {slug(c):<28} project {timings['project_s']:7.1f}s  cluster {timings['cluster_s']:6.2f}s  "
+                  f"{proj_used} | {clus_used}")
+    print(f"✅ {len(todo)} fits in {time.perf_counter() - t_fit:.1f}s ({len(configs) - len(todo)} cached)")
+
+    # 3) package every configuration (cache hits: JSON/bundle/search/viewer only)
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        codes = dict(zip([slug(c) for c in configs], pool.map(_package, configs)))
+    for c in configs:
+        s = slug(c)
+        hit = load_artifacts(art_dir, keys[s])
+        if hit:
+            results[s].update(projector=hit[1]["projector"], clustering=hit[1]["clustering"])
+            if results[s]["cached"]:  # fitted by an earlier sweep: still part of this store
+                write_store(store, {f"{s}.coords": hit[0]["coords"], f"{s}.clabels": hit[0]["clabels"]}, update=True)
+        results[s].update(config=c, ok=codes[s] == 0, viewer=f"{s}/{VIEWER}")
+        if codes[s]:
+            print(f"⚠️  {s}: {SCRIPT} exited {codes[s]} (see {s}/log.txt)")
+
+    # 4) index page
+    rows = "\n".join(
+        f'<tr><td><a href="{html.escape(r["viewer"])}">{html.escape(s)}</a></td>'
+        f'<td>{html.escape(r.get("projector", "?"))}</td><td>{html.escape(r.get("clustering", "?"))}</td>'
+        f'<td>{"cached" if r["cached"] else str(r["fit_s"]) + " s"}</td><td>{"" if r["ok"] else "failed"}</td></tr>'
+        for s, r in results.items()
+    )
+    (OUT_DIR / "index.html").write_text(f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"/><title>Embedding sweep — {html.escape(SCRIPT)}</title>
+<style>
+  body{{font-family:'Segoe UI', Helvetica, Arial, sans-serif; background:#f8f9fa; color:#333; margin:32px}}
+  table{{border-collapse:collapse; background:#fff; box-shadow:0 2px 12px rgba(0,0,0,.08); border-radius:12px; overflow:hidden}}
+  th, td{{padding:8px 14px; text-align:left; font-size:13px; border-bottom:1px solid #eee}}
+  th{{background:#f1f3f5; font-weight:600}}
+  a{{color:#4C78A8; text-decoration:none}}
+</style></head><body>
+<h2>{html.escape(SCRIPT)} — {len(configs)} layouts</h2>
+<p>{X.shape[0]:,} rows × {X.shape[1]} features {html.escape(" ".join(passthrough))}.
+The viewers fetch their data, so serve this folder over HTTP (e.g. <code>python -m http.server</code>).</p>
+<table><tr><th>configuration</th><th>projector</th><th>clustering</th><th>fit</th><th></th></tr>
+{rows}
+</table></body></html>
+""", encoding="utf-8")
+    (OUT_DIR / "sweep.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"✅ wrote {OUT_DIR / 'index.html'}")